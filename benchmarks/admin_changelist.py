@@ -0,0 +1,76 @@
+"""
+Время рендера списков, форм изменения и панелей связанных объектов
+в админке по мере роста таблиц.
+Данные добавляются командой generate_data ступенями до заданного числа
+постов (пользователей — в десять раз меньше). Время и число запросов не
+должны расти вместе с таблицами.
+
+python benchmarks/admin_changelist.py --steps 1000 10000 100000
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from common import measure, print_table, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--steps', type=int, nargs='+',
+                        default=(1000, 10000, 100000))
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup_django(test_db_name=str(Path(tmp_dir) / 'bench.sqlite3'))
+
+        from django.db import connection, reset_queries
+        from django.test import Client
+        from django.test.utils import CaptureQueriesContext
+
+        from blog.generator import generate_data
+        from blog.models import Comment, Post, User
+
+        admin = User.objects.create_superuser('admin', password='admin')
+        client = Client()
+        client.force_login(admin)
+
+        rows = []
+        posts = 0
+        for number, step in enumerate(sorted(args.steps)):
+            generate_data(users=max((step - posts) // 10, 1),
+                          categories=10, locations=10, posts=step - posts,
+                          prefix=f'step{number}')
+            posts = step
+            post = Post.objects.filter(comment_count__gt=0).first()
+            urls = {
+                'post list': '/admin/blog/post/',
+                'comment list': '/admin/blog/comment/',
+                'post change': f'/admin/blog/post/{post.pk}/change/',
+                'comment change': (f'/admin/blog/comment/'
+                                   f'{post.comments.first().pk}/change/'),
+                'category change': (f'/admin/blog/category/'
+                                    f'{post.category_id}/change/'),
+                'category posts': (f'/admin/blog/category/'
+                                   f'{post.category_id}/related/posts/'),
+            }
+            for page, url in urls.items():
+                client.get(url)
+                reset_queries()
+                with CaptureQueriesContext(connection) as context:
+                    status = client.get(url).status_code
+                rows.append({
+                    'posts': posts,
+                    'users': User.objects.count(),
+                    'comments': Comment.objects.count(),
+                    'page': page,
+                    'status': status,
+                    'queries': len(context),
+                    **measure(lambda: client.get(url), repeat=args.repeat),
+                })
+    print_table(rows, ('posts', 'users', 'comments', 'page', 'status',
+                       'queries', 'median_ms', 'p95_ms'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Нагрузочный тест страниц только для чтения: синхронные и асинхронные
+view под ASGI. Запросы к ASGI-приложению отправляются без сетевого
+сервера через AsyncClient, concurrency задает число одновременных
+запросов. Для каждого режима выводятся запросы в секунду, задержки и
+пиковый объем памяти, выделенной Python во время прогона.
+
+python benchmarks/async_views.py --concurrency 50 --requests 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from common import percentile, print_table, setup_django
+
+MODES = ('sync', 'async')
+
+
+def run_mode(mode: str, concurrency: int, requests: int,
+             posts: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Набор middleware зависит от режима и выбирается в настройках.
+        os.environ['BLOG_ASYNC_VIEWS'] = '1' if mode == 'async' else ''
+        # Кэш страниц отключен, чтобы каждый запрос доходил до view.
+        setup_django(test_db_name=str(Path(tmp_dir) / 'bench.sqlite3'),
+                     BLOG_PAGE_CACHE_TIMEOUT=0)
+
+        from django.test import AsyncClient
+        from mixer.backend.django import mixer
+
+        category = mixer.blend('blog.Category', is_published=True)
+        author = mixer.blend('auth.User')
+        post_ids = [
+            post.pk for post in mixer.cycle(posts).blend(
+                'blog.Post', author=author, category=category,
+                is_published=True, image=None,
+            )
+        ]
+        urls = [
+            '/',
+            '/?page=2',
+            f'/category/{category.slug}/',
+            f'/profile/{author.username}/',
+            *(f'/posts/{post_id}/' for post_id in post_ids[:20]),
+        ]
+
+        async def load():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+            latencies, errors = [], []
+
+            async def fetch(number: int):
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.get(urls[number % len(urls)])
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    if response.status_code != 200:
+                        errors.append(response.status_code)
+
+            # Прогрев: шаблоны, URLConf и подключения к БД.
+            await asyncio.gather(*(fetch(number)
+                                   for number in range(len(urls))))
+            latencies.clear()
+            start = time.perf_counter()
+            await asyncio.gather(*(fetch(number)
+                                   for number in range(requests)))
+            return time.perf_counter() - start, sorted(latencies), errors
+
+        tracemalloc.start()
+        elapsed, latencies, errors = asyncio.run(load())
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        'mode': mode,
+        'concurrency': concurrency,
+        'requests': requests,
+        'errors': len(errors),
+        'req_per_sec': round(requests / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.5), 1),
+        'p95_ms': round(percentile(latencies, 0.95), 1),
+        'peak_mb': round(peak_memory / 2 ** 20, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--posts', type=int, default=100)
+    parser.add_argument('--mode', choices=MODES)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.concurrency,
+                                  args.requests, args.posts)))
+        return
+
+    # URLConf выбирает view при импорте, поэтому каждый режим
+    # запускается в отдельном процессе.
+    rows = []
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, '--mode', mode,
+             '--concurrency', str(args.concurrency),
+             '--requests', str(args.requests),
+             '--posts', str(args.posts)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        rows.append(json.loads(output.strip().splitlines()[-1]))
+    print_table(rows, ('mode', 'concurrency', 'requests', 'errors',
+                       'req_per_sec', 'p50_ms', 'p95_ms', 'peak_mb'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Пропускная способность добавления комментариев параллельными клиентами
+для SQLite с настройками по умолчанию и с профилем из settings.py
+(WAL, synchronous=NORMAL, busy_timeout, постоянные подключения).
+
+python benchmarks/comment_writes.py --clients 8 --comments 50
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from common import print_table, setup_django
+
+PROFILES = ('default', 'tuned')
+
+
+def run_profile(profile: str, clients: int, comments: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        overrides = {}
+        if profile == 'default':
+            overrides['SQLITE_PRAGMAS'] = {}
+        setup_django(test_db_name=str(Path(tmp_dir) / 'bench.sqlite3'),
+                     **overrides)
+        if profile == 'default':
+            from django.conf import settings
+            settings.DATABASES['default']['CONN_MAX_AGE'] = 0
+
+        from django.db import connection
+        from django.test import Client
+        from mixer.backend.django import mixer
+
+        from blog.models import Comment
+
+        post = mixer.blend('blog.Post', category__is_published=True)
+        users = mixer.cycle(clients).blend('auth.User')
+        connection.close()
+        errors = []
+
+        def client_worker(user):
+            client = Client()
+            client.force_login(user)
+            try:
+                for number in range(comments):
+                    response = client.post(
+                        f'/posts/{post.pk}/comment/',
+                        data={'text': f'Комментарий {number}'},
+                    )
+                    if response.status_code != 302:
+                        errors.append(response.status_code)
+            except Exception as error:
+                errors.append(repr(error))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=client_worker, args=(user,))
+                   for user in users]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        total = Comment.objects.count()
+        connection.close()
+    return {
+        'profile': profile,
+        'clients': clients,
+        'comments': total,
+        'errors': len(errors),
+        'seconds': round(elapsed, 3),
+        'comments_per_sec': round(total / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--comments', type=int, default=50)
+    parser.add_argument('--profile', choices=PROFILES)
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(run_profile(args.profile, args.clients,
+                                     args.comments)))
+        return
+
+    # Каждый профиль запускается в отдельном процессе: настройки Django и
+    # режим журнала SQLite нельзя надежно сбросить внутри одного процесса.
+    rows = []
+    for profile in PROFILES:
+        output = subprocess.run(
+            [sys.executable, __file__, '--profile', profile,
+             '--clients', str(args.clients),
+             '--comments', str(args.comments)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        rows.append(json.loads(output.strip().splitlines()[-1]))
+    print_table(rows, ('profile', 'clients', 'comments', 'errors',
+                       'seconds', 'comments_per_sec'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Общие функции для бенчмарков.
+Бенчмарки запускаются из корня репозитория, например:
+python benchmarks/post_cards.py
+"""
+import atexit
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'blogicum'
+
+
+def setup_django(test_db_name: Optional[str] = None, **overrides) -> None:
+    """
+    Настраивает Django и создает для бенчмарка отдельную тестовую БД.
+    Для SQLite по умолчанию БД создается в памяти; test_db_name задает
+    файл, если бенчмарку нужны параллельные подключения. Загруженные
+    файлы сохраняются во временный MEDIA_ROOT, который удаляется при
+    выходе. overrides переопределяют настройки проекта.
+    """
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+    from django.conf import settings
+    media_dir = tempfile.TemporaryDirectory()
+    atexit.register(media_dir.cleanup)
+    overrides.setdefault('MEDIA_ROOT', media_dir.name)
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    if test_db_name:
+        settings.DATABASES['default']['TEST'] = {'NAME': test_db_name}
+
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    settings.DEBUG = False
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def percentile(values, fraction: float) -> float:
+    """
+    Перцентиль отсортированного списка методом ближайшего ранга: при малом
+    числе замеров p95 — это самый долгий из них, а не предпоследний.
+    """
+    return values[max(math.ceil(len(values) * fraction) - 1, 0)]
+
+
+def measure(func: Callable[[], object], repeat: int = 20) -> Dict[str, float]:
+    """Возвращает медиану и перцентили времени выполнения func в мс."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'min_ms': round(timings[0], 3),
+    }
+
+
+def print_table(rows, columns) -> None:
+    widths = [
+        max(len(str(column)), *(len(str(row[column])) for row in rows))
+        for column in columns
+    ]
+    print('  '.join(str(c).ljust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        print('  '.join(str(row[c]).ljust(w) for c, w in zip(columns, widths)))
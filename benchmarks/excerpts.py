@@ -0,0 +1,72 @@
+"""
+Страница списка постов со 100-килобайтными текстами: загрузка полного
+текста и truncatewords в шаблоне против готового анонса (Post.excerpt)
+без загрузки текста. Для страниц ленты (10 постов) и списка админки
+(100 постов) выводятся время и пиковый объем памяти Python.
+
+python benchmarks/excerpts.py --posts 500 --text-kb 100
+"""
+import argparse
+import tracemalloc
+
+from common import measure, print_table, setup_django
+
+PAGE_SIZES = (10, 100)
+TEMPLATES = {
+    'text': '{% for post in posts %}{{ post.text|truncatewords:10 }}'
+            '{% endfor %}',
+    'excerpt': '{% for post in posts %}{{ post.excerpt }}{% endfor %}',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--posts', type=int, default=500)
+    parser.add_argument('--text-kb', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.template import Context, Template
+
+    from blog.generator import generate_data
+    from blog.models import Post
+    from blog.querysets import FEED_FIELDS
+    from blog.utils import make_excerpt
+
+    generate_data(users=10, posts=args.posts, comments_per_post=0)
+    words = 'длинный текст поста '
+    text = words * (args.text_kb * 1024 // len(words.encode()))
+    Post.objects.update(text=text, excerpt=make_excerpt(text))
+
+    querysets = {
+        'text': Post.objects.with_feed_data().only(*FEED_FIELDS, 'text'),
+        'excerpt': Post.objects.with_feed_data(),
+    }
+    rows = []
+    for per_page in PAGE_SIZES:
+        for mode, queryset in querysets.items():
+            template = Template(TEMPLATES[mode])
+
+            def render():
+                posts = list(queryset.order_by('-pk')[:per_page])
+                return template.render(Context({'posts': posts}))
+
+            render()
+            tracemalloc.start()
+            render()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            rows.append({
+                'per_page': per_page,
+                'mode': mode,
+                'peak_kb': round(peak_memory / 1024),
+                **measure(render, repeat=args.repeat),
+            })
+    print_table(rows, ('per_page', 'mode', 'median_ms', 'p95_ms', 'min_ms',
+                       'peak_kb'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Сравнение времени рендера страницы из 10 и 100 карточек постов
+с кэшем фрагментов и без него.
+"""
+from common import measure, print_table, setup_django
+
+setup_django()
+
+from django.template import engines  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from mixer.backend.django import mixer  # noqa: E402
+
+from blog.models import Post  # noqa: E402
+
+PAGE_TEMPLATE = engines['django'].from_string(
+    '{% for post in posts %}'
+    '{% include "includes/post_card.html" %}'
+    '{% endfor %}'
+)
+DUMMY_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+def main():
+    category = mixer.blend('blog.Category', is_published=True)
+    location = mixer.blend('blog.Location', is_published=True)
+    mixer.cycle(100).blend('blog.Post', category=category, location=location,
+                           text=mixer.faker.text)
+    rows = []
+    for size in (10, 100):
+        posts = list(Post.objects.with_feed_data().newest_first()[:size])
+
+        def render():
+            return PAGE_TEMPLATE.render({'posts': posts})
+
+        with override_settings(CACHES=DUMMY_CACHE):
+            rows.append({'cards': size, 'cache': 'нет', **measure(render)})
+        render()
+        rows.append({'cards': size, 'cache': 'да', **measure(render)})
+    print_table(rows, ('cards', 'cache', 'median_ms', 'p95_ms', 'min_ms'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Страница комментариев поста: форматирование текстов фильтром linebreaksbr
+при каждом выводе против готового HTML из CommentHTML. Выводятся время и
+пиковый объем памяти Python для страницы из COMMENTS_ON_PAGE комментариев
+разной длины.
+
+python benchmarks/rendering.py --comment-words 300
+"""
+import argparse
+import random
+import tracemalloc
+
+from common import measure, print_table, setup_django
+
+TEMPLATES = {
+    'linebreaksbr': '{% for comment in comments %}'
+                    '{{ comment.text|linebreaksbr }}{% endfor %}',
+    'stored': '{% for comment in comments %}{{ comment.text_as_html }}'
+              '{% endfor %}',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--comment-words', type=int, nargs='+',
+                        default=(20, 300))
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.template import Context, Template
+
+    from blog.constants import COMMENTS_ON_PAGE
+    from blog.generator import generate_data, make_text
+    from blog.models import Comment, Post
+    from blog.rendering import save_rendered
+
+    generate_data(users=10, posts=len(args.comment_words),
+                  comments_per_post=0)
+    rng = random.Random(0)
+    rows = []
+    for words, post in zip(args.comment_words, Post.objects.all()):
+        # Строки по десять слов, как абзацы в настоящих комментариях.
+        comments = Comment.objects.bulk_create(
+            Comment(post=post, author_id=post.author_id,
+                    text='\n'.join(make_text(rng, 10)
+                                   for _ in range(words // 10)))
+            for _ in range(COMMENTS_ON_PAGE)
+        )
+        save_rendered(Comment, comments)
+        querysets = {
+            'linebreaksbr': post.comments.select_related('author'),
+            'stored': post.comments.select_related('author', 'rendered')
+            .defer('text'),
+        }
+        for mode, queryset in querysets.items():
+            template = Template(TEMPLATES[mode])
+
+            def render():
+                page = list(queryset.order_by('created_at', 'pk'))
+                return template.render(Context({'comments': page}))
+
+            render()
+            tracemalloc.start()
+            render()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            rows.append({
+                'words': words,
+                'mode': mode,
+                'peak_kb': round(peak_memory / 1024),
+                **measure(render, repeat=args.repeat),
+            })
+    print_table(rows, ('words', 'mode', 'median_ms', 'p95_ms', 'min_ms',
+                       'peak_kb'))
+
+
+if __name__ == '__main__':
+    main()
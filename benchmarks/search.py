@@ -0,0 +1,95 @@
+"""
+Поиск по индексу (FTS5 для SQLite, tsvector для PostgreSQL) против
+перебора таблицы через icontains: время получения первой страницы
+результатов для частых, редких и составных запросов.
+
+python benchmarks/search.py --posts 1000000
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from common import measure, print_table, setup_django
+
+QUERIES = {
+    'частое слово': 'город',
+    'редкое слово': 'кинематограф',
+    'два слова': 'поезд море',
+    'другая форма': 'путешествиями',
+}
+
+
+def fill_posts(total: int, batch_size: int = 10000) -> None:
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from blog.generator import make_text
+    from blog.models import Category, Post, User
+    from blog.search import rebuild_index
+
+    rng = random.Random(0)
+    author = User.objects.create(username='author')
+    category = Category.objects.create(title='Категория', slug='category',
+                                       description='')
+    now = timezone.now()
+    for start in range(0, total, batch_size):
+        with transaction.atomic():
+            Post.objects.bulk_create(
+                Post(title=make_text(rng, 5), text=make_text(rng, 60),
+                     pub_date=now - timedelta(minutes=number),
+                     author=author, category=category)
+                for number in range(start, min(start + batch_size, total))
+            )
+    # Редкое слово встречается в одном посте из 10 000.
+    Post.objects.filter(pk__in=range(1, total + 1, 10000)).update(
+        text='Статья о кинематографе.'
+    )
+    start = time.perf_counter()
+    with transaction.atomic():
+        rebuild_index(Post, connection)
+    print(f'Индекс построен за {time.perf_counter() - start:.1f} с.')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--posts', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup_django(test_db_name=str(Path(tmp_dir) / 'bench.sqlite3'))
+
+        from django.db.models import Q
+
+        from blog.constants import OBJECTS_ON_PAGE
+        from blog.models import Post
+        from blog.search import search_posts
+
+        fill_posts(args.posts)
+        posts = Post.published.with_feed_data()
+        rows = []
+        for name, query in QUERIES.items():
+            def indexed():
+                return list(search_posts(posts, query)
+                            .order_by('-rank', '-pk')[:OBJECTS_ON_PAGE])
+
+            def scan():
+                condition = Q()
+                for word in query.split():
+                    condition &= (Q(title__icontains=word)
+                                  | Q(text__icontains=word))
+                return list(posts.filter(condition)[:OBJECTS_ON_PAGE])
+
+            for method, func in (('icontains', scan), ('индекс', indexed)):
+                rows.append({'query': name, 'method': method,
+                             'found': len(func()),
+                             **measure(func, repeat=args.repeat)})
+        print_table(rows, ('query', 'method', 'found', 'median_ms',
+                           'p95_ms', 'min_ms'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Статика через StaticFilesMiddleware: размер ответа и время отдачи файла
+для каждой кодировки. Файлы собираются collectstatic во временный
+STATIC_ROOT. Копия .br создается, только если установлен пакет Brotli.
+
+python benchmarks/static_files.py --file css/bootstrap.min.css
+"""
+import argparse
+import tempfile
+
+from common import measure, print_table, setup_django
+
+ACCEPT_ENCODINGS = ('', 'gzip', 'gzip, br')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--file', nargs='+',
+                        default=('css/bootstrap.min.css',
+                                 'js/admin_related_panels.js'))
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    static_root = tempfile.mkdtemp()
+    setup_django(STATIC_ROOT=static_root)
+
+    from django.contrib.staticfiles.storage import staticfiles_storage
+    from django.core.management import call_command
+    from django.test import Client
+
+    call_command('collectstatic', interactive=False, verbosity=0)
+    client = Client()
+    rows = []
+    for name in args.file:
+        url = staticfiles_storage.url(name)
+        for accept_encoding in ACCEPT_ENCODINGS:
+            def fetch():
+                response = client.get(url,
+                                      HTTP_ACCEPT_ENCODING=accept_encoding)
+                return b''.join(response.streaming_content)
+
+            response = client.get(url, HTTP_ACCEPT_ENCODING=accept_encoding)
+            rows.append({
+                'file': name,
+                'accept': accept_encoding or '-',
+                'encoding': response.headers.get('Content-Encoding', '-'),
+                'kb': round(len(b''.join(response.streaming_content)) / 1024,
+                            1),
+                'cache': response.headers['Cache-Control'],
+                **measure(fetch, repeat=args.repeat),
+            })
+    print_table(rows, ('file', 'accept', 'encoding', 'kb', 'median_ms',
+                       'p95_ms', 'cache'))
+
+
+if __name__ == '__main__':
+    main()
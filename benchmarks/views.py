@@ -0,0 +1,211 @@
+"""
+Бенчмарк всех страниц из blog/urls.py и pages/urls.py на синтетических
+данных команды generate_data. Для каждого URL под анонимом и под автором
+поста измеряются задержка, число SQL-запросов и пиковый объем памяти,
+выделенной Python за запрос. Результаты с хэшем коммита сохраняются в
+JSON, чтобы сравнивать их между коммитами:
+
+python benchmarks/views.py --posts 10000 --output before.json
+python benchmarks/views.py --posts 10000 --compare before.json
+
+Кэш страниц по умолчанию отключен, чтобы каждый запрос доходил до view.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import tracemalloc
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+
+from common import PROJECT_DIR, measure, print_table, setup_django
+
+NAMESPACES = ('blog', 'pages')
+# Строки запроса, с которыми дополнительно проверяется страница.
+VARIANTS = {
+    'blog:index': ('', '?page=last'),
+    'blog:search': ('?q=город', '?q=поезд+море'),
+}
+USERS = ('anonymous', 'author')
+COLUMNS = ('url', 'user', 'status', 'queries', 'median_ms', 'p95_ms',
+           'peak_kb', 'size_kb')
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR,
+            check=True, capture_output=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def get_url_names():
+    """
+    Имена всех URL пространств имен NAMESPACES и имена их параметров
+    с учетом префиксов include().
+    """
+    from django.urls import URLResolver, get_resolver
+
+    def walk(patterns, namespace, params):
+        for pattern in patterns:
+            pattern_params = params + tuple(pattern.pattern.converters)
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns,
+                                pattern.namespace or namespace,
+                                pattern_params)
+            elif namespace in NAMESPACES and pattern.name:
+                yield f'{namespace}:{pattern.name}', pattern_params
+
+    return list(walk(get_resolver().url_patterns, None, ()))
+
+
+def get_sample_kwargs() -> dict:
+    """
+    Параметры URL: видимый пост с наибольшим числом комментариев (худший
+    случай для тяжелого хвоста), его категория, автор и комментарий автора.
+    """
+    from blog.models import Comment, Post
+
+    post = (Post.published.select_related('author', 'category')
+            .order_by('-comment_count').first())
+    comment = (post.comments.filter(author=post.author).first()
+               or Comment.objects.create(post=post, author=post.author,
+                                         text='Комментарий автора'))
+    return {
+        'post_id': post.pk,
+        'comment_id': comment.pk,
+        'category_slug': post.category.slug,
+        'username': post.author.username,
+    }, post.author
+
+
+def build_urls(sample: dict):
+    from django.urls import reverse
+
+    urls = []
+    for name, params in get_url_names():
+        path = reverse(name, kwargs={param: sample[param]
+                                     for param in params})
+        for query in VARIANTS.get(name, ('',)):
+            urls.append((name, path + query))
+    return urls
+
+
+def run_request(client, url: str, repeat: int) -> dict:
+    from django.db import connections, reset_queries
+    from django.test.utils import CaptureQueriesContext
+
+    client.get(url)  # Прогрев шаблонов и кэшей Python.
+    # request_started очищает журнал запросов, поэтому он должен быть
+    # пуст и до входа в CaptureQueriesContext.
+    reset_queries()
+    with ExitStack() as stack:
+        contexts = [stack.enter_context(CaptureQueriesContext(connection))
+                    for connection in connections.all()]
+        response = client.get(url)
+    # Следующие запросы снова очистят журнал, поэтому запросы
+    # считаются сразу.
+    queries = sum(len(context) for context in contexts)
+    tracemalloc.start()
+    client.get(url)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'status': response.status_code,
+        'queries': queries,
+        'peak_kb': round(peak_memory / 1024, 1),
+        'size_kb': round(len(getattr(response, 'content', b'')) / 1024, 1),
+        **measure(lambda: client.get(url), repeat=repeat),
+    }
+
+
+def compare(rows, baseline_path: str) -> None:
+    baseline = json.loads(Path(baseline_path).read_text(encoding='utf-8'))
+    previous = {(row['url'], row['user']): row
+                for row in baseline['results']}
+    print(f'\nСравнение с {baseline["meta"]["commit"]}:')
+    changes = []
+    for row in rows:
+        old = previous.get((row['url'], row['user']))
+        if old is None:
+            continue
+        changes.append({
+            'url': row['url'],
+            'user': row['user'],
+            'queries': f'{old["queries"]} -> {row["queries"]}',
+            'median_ms': f'{old["median_ms"]} -> {row["median_ms"]}',
+            'change': (f'{(row["median_ms"] / old["median_ms"] - 1):+.0%}'
+                       if old['median_ms'] else '-'),
+            'peak_kb': f'{old["peak_kb"]} -> {row["peak_kb"]}',
+        })
+    print_table(changes, ('url', 'user', 'queries', 'median_ms', 'change',
+                          'peak_kb'))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--locations', type=int, default=50)
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--comments-per-post', type=float, default=5.0)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--page-cache', action='store_true',
+                        help='Не отключать кэш страниц.')
+    parser.add_argument('--output', help='Файл для результатов в JSON.')
+    parser.add_argument('--compare', help='JSON прошлого прогона.')
+    args = parser.parse_args()
+
+    overrides = {} if args.page_cache else {'BLOG_PAGE_CACHE_TIMEOUT': 0}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup_django(test_db_name=str(Path(tmp_dir) / 'bench.sqlite3'),
+                     **overrides)
+
+        import django
+        from django.db import connection
+        from django.test import Client
+
+        from blog.generator import generate_data
+
+        dataset = generate_data(
+            users=args.users, categories=args.categories,
+            locations=args.locations, posts=args.posts,
+            comments_per_post=args.comments_per_post,
+        )
+        sample, author = get_sample_kwargs()
+        clients = {'anonymous': Client(), 'author': Client()}
+        clients['author'].force_login(author)
+
+        rows = []
+        for name, url in build_urls(sample):
+            for user in USERS:
+                rows.append({'name': name, 'url': url, 'user': user,
+                             **run_request(clients[user], url, args.repeat)})
+        meta = {
+            'commit': get_commit(),
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'page_cache': args.page_cache,
+            'repeat': args.repeat,
+            'dataset': dict(dataset),
+        }
+
+    print_table(rows, COLUMNS)
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps({'meta': meta, 'results': rows},
+                       ensure_ascii=False, indent=2),
+            encoding='utf-8',
+        )
+    if args.compare:
+        compare(rows, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,313 @@
+from typing import Tuple
+
 from django.contrib import admin
+from django.contrib.admin.utils import (display_for_field,
+                                        display_for_value, label_for_field,
+                                        lookup_field)
+from django.contrib.admin.views.main import PAGE_VAR
+from django.contrib.admin.widgets import (AutocompleteSelect,
+                                          ForeignKeyRawIdWidget)
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.http import urlencode
+from django.utils.text import Truncator
 
 from blog.constants import COMMENT_DISPLAY_LENGTH
-from blog.models import Category, Comment, Location, Post
+from blog.models import Category, Comment, Job, Location, Post
+from blog.paginators import CursorPaginator, EstimatedCountPaginator
 from blog.utils import get_short_text
 
 
-class PostInline(admin.StackedInline):
-    model = Post
-    extra = 1
+class RelatedInputFilter(admin.FieldListFilter):
+    """
+    Фильтр по связанному объекту без списка вариантов: значение поля
+    lookup связанной модели вводится вручную, поэтому боковая панель
+    не загружает все связанные объекты.
+    """
+
+    template = 'admin/blog/input_filter.html'
+    lookup = 'pk'
+
+    def __init__(self, field, request, params, model, model_admin,
+                 field_path):
+        self.parameter_name = f'{field_path}__{self.lookup}'
+        super().__init__(field, request, params, model, model_admin,
+                         field_path)
+        # Пустое поле формы означает «без фильтра».
+        self.value = self.used_parameters.get(self.parameter_name) or None
+        if self.value is None:
+            self.used_parameters.pop(self.parameter_name, None)
+
+    def expected_parameters(self):
+        return [self.parameter_name]
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.value is None,
+            'query_string': changelist.get_query_string(
+                remove=[self.parameter_name, PAGE_VAR]
+            ),
+            'display': 'Все',
+        }
+        yield {
+            'selected': self.value is not None,
+            'parameter_name': self.parameter_name,
+            'value': self.value or '',
+            'hidden_params': [
+                (name, value) for name, value in changelist.params.items()
+                if name not in (self.parameter_name, PAGE_VAR)
+            ],
+        }
+
+
+class UsernameFilter(RelatedInputFilter):
+    lookup = 'username'
+
+
+class LocationNameFilter(RelatedInputFilter):
+    lookup = 'name'
+
+
+class PreloadedChoiceMixin:
+    """
+    Виджет внешнего ключа, которому форма списка передает уже выбранный
+    через list_select_related объект: иначе виджет загружал бы его
+    отдельным запросом в каждой строке.
+    """
+
+    preloaded = None
+
+    def get_preloaded(self, value):
+        values = value if isinstance(value, (list, tuple)) else [value]
+        if (self.preloaded is not None
+                and [str(item) for item in values]
+                == [str(self.preloaded.pk)]):
+            return self.preloaded
+        return None
+
+
+class PreloadedAutocompleteSelect(PreloadedChoiceMixin, AutocompleteSelect):
+
+    def optgroups(self, name, value, attr=None):
+        obj = self.get_preloaded(value)
+        if obj is None:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name, obj.pk, self.choices.field.label_from_instance(obj), True,
+            len(options),
+        ))
+        return [(None, options, 0)]
+
+
+class PreloadedRawIdWidget(PreloadedChoiceMixin, ForeignKeyRawIdWidget):
+
+    def label_and_url_for_value(self, value):
+        obj = self.get_preloaded(value)
+        if obj is None:
+            return super().label_and_url_for_value(value)
+        opts = obj._meta
+        url = reverse(
+            f'{self.admin_site.name}:{opts.app_label}_{opts.model_name}'
+            f'_change',
+            args=(obj.pk,),
+        )
+        return Truncator(obj).words(14), url
+
+
+class PreloadedChangeListFormSetMixin:
+    """Передает виджетам формы объекты, связанные со строкой списка."""
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        for name, field in form.fields.items():
+            widget = getattr(field.widget, 'widget', field.widget)
+            if isinstance(widget, PreloadedChoiceMixin):
+                widget.preloaded = getattr(form.instance, name, None)
+        return form
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    """
+    Список объектов большой таблицы: без полного COUNT(*) и с примерным
+    числом строк для нефильтрованного списка. Внешние ключи в
+    list_editable редактируются виджетами autocomplete_fields и
+    raw_id_fields, которые не загружают связанные таблицы.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if 'widget' not in kwargs:
+            db = kwargs.get('using')
+            if db_field.name in self.get_autocomplete_fields(request):
+                kwargs['widget'] = PreloadedAutocompleteSelect(
+                    db_field, self.admin_site, using=db
+                )
+            elif db_field.name in self.raw_id_fields:
+                kwargs['widget'] = PreloadedRawIdWidget(
+                    db_field.remote_field, self.admin_site, using=db
+                )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_formset(self, request, **kwargs):
+        formset = super().get_changelist_formset(request, **kwargs)
+        return type(formset.__name__,
+                    (PreloadedChangeListFormSetMixin, formset), {})
+
+    def lookup_allowed(self, lookup, value):
+        # Параметры RelatedInputFilter идут через поле связанной модели,
+        # ModelAdmin разрешает такие только для явно указанных фильтров.
+        input_lookups = {
+            f'{item[0]}__{item[1].lookup}' for item in self.list_filter
+            if isinstance(item, tuple)
+            and issubclass(item[1], RelatedInputFilter)
+        }
+        return (lookup in input_lookups
+                or super().lookup_allowed(lookup, value))
+
 
+class RelatedPanel:
+    """
+    Панель связанных объектов на странице изменения. Вместо inline, который
+    рендерит форму на каждый связанный объект, панель загружается по
+    нажатию и листается страницами по курсору (order_field, id), поэтому
+    страница изменения не зависит от числа связанных объектов.
+    """
 
-class CommentInline(admin.StackedInline):
-    model = Comment
-    extra = 1
+    per_page = 20
+
+    def __init__(self, name: str, model, field: str,
+                 columns: Tuple[str, ...], order_field: str = 'pk',
+                 select_related: Tuple[str, ...] = (),
+                 defer: Tuple[str, ...] = ()):
+        self.name = name
+        self.model = model
+        self.field = field
+        self.columns = columns
+        self.order_field = order_field
+        self.select_related = select_related
+        self.defer = defer
+
+    @property
+    def title(self) -> str:
+        return self.model._meta.verbose_name_plural
+
+    def get_page(self, obj, cursor):
+        queryset = (self.model._default_manager
+                    .filter(**{self.field: obj})
+                    .select_related(*self.select_related)
+                    .defer(*self.defer))
+        return CursorPaginator(queryset, self.per_page,
+                               order_field=self.order_field).page(cursor)
+
+
+class RelatedPanelsAdmin(admin.ModelAdmin):
+    """Показывает related_panels на странице изменения объекта."""
+
+    change_form_template = 'admin/blog/change_form_related.html'
+    related_panels: Tuple[RelatedPanel, ...] = ()
+
+    class Media:
+        js = ('js/admin_related_panels.js',)
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path('<path:object_id>/related/<str:panel_name>/',
+                 self.admin_site.admin_view(self.related_panel_view),
+                 name=f'{opts.app_label}_{opts.model_name}_related'),
+            *super().get_urls(),
+        ]
+
+    def get_related_panel_url(self, object_id, panel: RelatedPanel) -> str:
+        opts = self.model._meta
+        return reverse(
+            f'{self.admin_site.name}:{opts.app_label}_{opts.model_name}'
+            f'_related',
+            args=(object_id, panel.name),
+        )
+
+    def change_view(self, request, object_id, form_url='',
+                    extra_context=None):
+        extra_context = extra_context or {}
+        extra_context['related_panels'] = [
+            (panel, self.get_related_panel_url(object_id, panel))
+            for panel in self.related_panels
+        ]
+        return super().change_view(request, object_id, form_url,
+                                   extra_context)
+
+    def related_panel_view(self, request, object_id, panel_name):
+        """Фрагмент HTML с одной страницей связанных объектов."""
+        panel = next((panel for panel in self.related_panels
+                      if panel.name == panel_name), None)
+        obj = self.get_object(request, object_id)
+        if panel is None or obj is None:
+            raise Http404
+        related_admin = self.admin_site._registry.get(panel.model)
+        if not (self.has_view_or_change_permission(request, obj)
+                and related_admin is not None
+                and related_admin.has_view_or_change_permission(request)):
+            raise PermissionDenied
+
+        page = panel.get_page(obj, request.GET.get('cursor'))
+        opts = panel.model._meta
+        url_prefix = (f'{self.admin_site.name}:'
+                      f'{opts.app_label}_{opts.model_name}')
+        url = self.get_related_panel_url(object_id, panel)
+        rows = []
+        for related in page:
+            values = []
+            for name in panel.columns:
+                field, _, value = lookup_field(name, related, related_admin)
+                values.append(
+                    display_for_field(value, field,
+                                      self.admin_site.empty_value_display)
+                    if field is not None else
+                    display_for_value(value,
+                                      self.admin_site.empty_value_display)
+                )
+            rows.append((reverse(f'{url_prefix}_change', args=(related.pk,)),
+                         values))
+        return TemplateResponse(request, 'admin/blog/related_panel.html', {
+            'panel': panel,
+            'headers': [label_for_field(name, panel.model, related_admin)
+                        for name in panel.columns],
+            'rows': rows,
+            'next_url': (f'{url}?{urlencode({"cursor": page.next_cursor})}'
+                         if page.has_next() else None),
+            'previous_url': (
+                f'{url}?{urlencode({"cursor": page.previous_cursor})}'
+                if page.has_previous() else None
+            ),
+            # Полный список с фильтром и форма добавления с заполненной
+            # связью.
+            'changelist_url': (
+                f'{reverse(f"{url_prefix}_changelist")}?'
+                f'{urlencode({f"{panel.field}__pk__exact": obj.pk})}'
+            ),
+            'add_url': (f'{reverse(f"{url_prefix}_add")}?'
+                        f'{urlencode({panel.field: obj.pk})}'),
+        })
+
+
+# Посты листаются по id: фильтр по категории или месту и сортировка
+# обслуживаются индексом внешнего ключа.
+POSTS_PANEL_COLUMNS = ('title', 'author', 'pub_date', 'is_published')
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
-    inlines = (PostInline,)
+class CategoryAdmin(RelatedPanelsAdmin):
+    related_panels = (
+        RelatedPanel('posts', Post, 'category', POSTS_PANEL_COLUMNS,
+                     select_related=('author',), defer=('text',)),
+    )
 
     list_display = (
         'title',
@@ -40,8 +330,12 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
-    inlines = (CommentInline,)
+class PostAdmin(ScalableAdmin, RelatedPanelsAdmin):
+    related_panels = (
+        RelatedPanel('comments', Comment, 'post',
+                     ('short_comment', 'author', 'created_at'),
+                     order_field='created_at', select_related=('author',)),
+    )
 
     list_display = (
         'title',
@@ -56,9 +350,11 @@ class PostAdmin(admin.ModelAdmin):
 
     @admin.display(description='Сокращенный текст')
     def short_text(self, obj) -> str:
-        """Выводит сохращенный текст поста."""
-        return get_short_text(text=obj.text)
+        """Выводит анонс поста: полный текст в списке не загружается."""
+        return obj.excerpt
 
+    # Внешние ключи редактируются виджетами автодополнения: выпадающим
+    # списком каждый из них загружал бы всю таблицу.
     list_editable = (
         'author',
         'pub_date',
@@ -66,21 +362,31 @@ class PostAdmin(admin.ModelAdmin):
         'category',
         'is_published'
     )
+    list_select_related = ('author', 'location', 'category')
+    autocomplete_fields = ('author', 'location', 'category')
     search_fields = ('title',)
     list_filter = (
-        'author',
+        ('author', UsernameFilter),
         'category',
         'pub_date',
         'created_at',
         'is_published',
-        'location'
+        ('location', LocationNameFilter),
     )
     list_display_links = ('title',)
+    # Сортировка по первичному ключу идет по индексу.
+    ordering = ('-pk',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('text')
 
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
-    inlines = (PostInline,)
+class LocationAdmin(RelatedPanelsAdmin):
+    related_panels = (
+        RelatedPanel('posts', Post, 'location', POSTS_PANEL_COLUMNS,
+                     select_related=('author',), defer=('text',)),
+    )
 
     list_display = (
         'name',
@@ -88,6 +394,7 @@ class LocationAdmin(admin.ModelAdmin):
         'created_at'
     )
     list_editable = ('is_published',)
+    search_fields = ('name',)
     list_filter = (
         'is_published',
         'created_at'
@@ -96,7 +403,7 @@ class LocationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ScalableAdmin):
     list_display = (
         'short_comment',
         'author',
@@ -104,12 +411,20 @@ class CommentAdmin(admin.ModelAdmin):
         'created_at',
     )
     list_editable = ('author', 'post')
+    list_select_related = ('author', 'post')
+    autocomplete_fields = ('author',)
+    raw_id_fields = ('post',)
     list_filter = (
-        'author',
-        'post',
+        ('author', UsernameFilter),
+        ('post', RelatedInputFilter),
         'created_at',
     )
     list_display_links = ('short_comment', )
+    ordering = ('-pk',)
+
+    def get_queryset(self, request):
+        # Для списка от поста нужен только заголовок.
+        return super().get_queryset(request).defer('post__text')
 
     @admin.display(description='Сокращенный текст')
     def short_comment(self, obj) -> str:
@@ -120,4 +435,18 @@ class CommentAdmin(admin.ModelAdmin):
         )
 
 
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'name',
+        'status',
+        'attempts',
+        'run_at',
+        'created_at',
+    )
+    list_filter = ('status',)
+    search_fields = ('name',)
+    readonly_fields = ('last_error', 'locked_at', 'created_at')
+
+
 admin.site.empty_value_display = 'Не задано'
@@ -6,3 +6,11 @@ class BlogConfig(AppConfig):
     name = 'blog'
 
     verbose_name = 'Блог'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from blog import signals, tasks  # noqa: F401
+        from blog.db import configure_sqlite
+
+        connection_created.connect(configure_sqlite)
@@ -0,0 +1,185 @@
+"""
+Асинхронные версии страниц только для чтения: лента, категория, профиль и
+пост. Подключаются вместо синхронных при BLOG_ASYNC_VIEWS = True и
+запуске под ASGI-сервером: запросы к БД идут через асинхронный API ORM,
+поток занимается только на время рендера шаблона.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views import View
+
+from blog.cache import (ais_feed_settled, can_cache_page, get_page_etag,
+                        get_page_key, page_cache, store_page)
+from blog.constants import OBJECTS_ON_PAGE
+from blog.models import Category, FeedEntry, User
+from blog.paginators import CursorPaginator
+from blog.rendering import aload_unrendered_texts
+from blog.views import (VisiblePostMixin, get_comments_context,
+                        get_comments_paginator, get_page_context,
+                        get_page_number, is_visible_to)
+
+
+async def aget_object_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404
+
+
+@sync_to_async
+def get_request_user(request):
+    """Загружает пользователя сессии (запрос к БД синхронный)."""
+    return request.user if request.user.is_authenticated else None
+
+
+class AsyncReadView(View):
+    """
+    Общая часть асинхронных страниц: проверка ETag, рендер шаблона
+    в потоке и кэш страниц для анонимных пользователей.
+    """
+
+    template_name = None
+    use_page_cache = False
+
+    async def get(self, request, *args, **kwargs):
+        etag = await sync_to_async(get_page_etag)(request)
+        if etag is not None:
+            etag = quote_etag(etag)
+            response = get_conditional_response(request, etag=etag)
+            if response is not None:
+                return response
+
+        self.user = await get_request_user(request)
+        key = None
+        cacheable = False
+        if self.use_page_cache and can_cache_page(request, self.user is None):
+            key = await sync_to_async(get_page_key)(request)
+            cached = await page_cache().aget(key)
+            if cached is not None:
+                return self.set_etag(cached, etag)
+            cacheable = await ais_feed_settled()
+
+        response = TemplateResponse(request, self.template_name,
+                                    await self.get_context_data())
+        await sync_to_async(response.render)()
+        if cacheable:
+            await sync_to_async(store_page)(key, response)
+        return self.set_etag(response, etag)
+
+    @staticmethod
+    def set_etag(response, etag):
+        if etag is not None:
+            response['ETag'] = etag
+        return response
+
+    async def get_context_data(self) -> dict:
+        return {'view': self}
+
+
+class AsyncFeedView(AsyncReadView):
+    """Асинхронный аналог ListViewMixin."""
+
+    paginate_by = OBJECTS_ON_PAGE
+    page_kwarg = 'page'
+    cursor_kwarg = 'cursor'
+    use_page_cache = True
+
+    async def get_queryset(self):
+        """Видимые записи ленты, наследники сужают выборку."""
+        return FeedEntry.objects.visible()
+
+    async def get_context_data(self) -> dict:
+        context = await super().get_context_data()
+        context.update(
+            await self.paginate((await self.get_queryset()).with_posts())
+        )
+        # Страница выбирается из FeedEntry, в шаблон идут посты записей.
+        page = context['page_obj']
+        page.object_list = [entry.post for entry in page.object_list]
+        context['object_list'] = context['post_list'] = page.object_list
+        return context
+
+    async def paginate(self, queryset) -> dict:
+        if settings.BLOG_CURSOR_PAGINATION:
+            paginator = CursorPaginator(queryset, self.paginate_by)
+            page = await paginator.apage(
+                self.request.GET.get(self.cursor_kwarg)
+            )
+        else:
+            paginator = Paginator(queryset, self.paginate_by)
+            paginator.count = await queryset.acount()
+            number = get_page_number(
+                paginator, self.request.GET.get(self.page_kwarg) or 1
+            )
+            bottom = (number - 1) * self.paginate_by
+            page = Page([obj async for obj in
+                         queryset[bottom:bottom + self.paginate_by]],
+                        number, paginator)
+        return get_page_context(paginator, page,
+                                settings.BLOG_CURSOR_PAGINATION)
+
+
+class IndexListView(AsyncFeedView):
+    """Главная страница."""
+
+    template_name = 'blog/index.html'
+
+
+class CategoryPostsListView(AsyncFeedView):
+    """Страница категории."""
+
+    template_name = 'blog/category.html'
+
+    async def get_queryset(self):
+        self.category = await aget_object_or_404(
+            Category.objects,
+            slug=self.kwargs.get('category_slug'),
+            is_published=True,
+        )
+        return FeedEntry.objects.visible().filter(category=self.category)
+
+    async def get_context_data(self) -> dict:
+        context = await super().get_context_data()
+        context['category'] = self.category
+        return context
+
+
+class ProfileListView(AsyncFeedView):
+    template_name = 'blog/profile.html'
+
+    async def get_queryset(self):
+        username = self.kwargs.get('username')
+        self.profile = await aget_object_or_404(User.objects,
+                                                username=username)
+        entries = FeedEntry.objects.filter(author=self.profile)
+        if self.user is not None and self.user.pk == self.profile.pk:
+            return entries
+        return entries.visible()
+
+    async def get_context_data(self) -> dict:
+        context = await super().get_context_data()
+        context['profile'] = self.profile
+        return context
+
+
+class PostDetailView(AsyncReadView):
+    template_name = 'blog/detail.html'
+
+    async def get_context_data(self) -> dict:
+        context = await super().get_context_data()
+        post = await aget_object_or_404(VisiblePostMixin.queryset.all(),
+                                        pk=self.kwargs.get('post_id'))
+        if not is_visible_to(post, self.user.pk if self.user else None):
+            raise Http404
+        comments_page = await get_comments_paginator(post).apage(
+            self.request.GET.get(VisiblePostMixin.comments_cursor_kwarg)
+        )
+        await aload_unrendered_texts(comments_page.object_list)
+        context.update({'object': post, 'post': post,
+                        **get_comments_context(comments_page)})
+        return context
@@ -0,0 +1,119 @@
+import hashlib
+import time
+from datetime import datetime
+from typing import Optional
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+from blog.routers import is_primary_forced
+
+FEED_VERSION_KEY = 'blog:feed:version'
+# Есть в кэше BLOG_PRIMARY_STICKY_SECONDS после смены версии ленты.
+FEED_CHANGED_KEY = 'blog:feed:changed'
+# Отсортированные моменты отложенных публикаций (timestamp): когда момент
+# наступает, версия ленты меняется даже без обработчика очереди.
+FEED_SCHEDULE_KEY = 'blog:feed:schedule'
+# Параметры запроса, от которых зависят страницы ленты, поиска и поста.
+PAGE_PARAMS = ('page', 'cursor', 'q', 'comments_cursor')
+
+
+def page_cache():
+    return caches[settings.BLOG_PAGE_CACHE_ALIAS]
+
+
+def get_feed_version() -> int:
+    """
+    Текущая версия ленты. Начальное значение берется из времени, чтобы
+    после вытеснения ключа из кэша версия не совпала с одной из прежних.
+    """
+    cache = page_cache()
+    cache.add(FEED_VERSION_KEY, int(time.time() * 1000), timeout=None)
+    schedule = cache.get(FEED_SCHEDULE_KEY)
+    if schedule and schedule[0] <= time.time():
+        cache.set(FEED_SCHEDULE_KEY,
+                  [moment for moment in schedule if moment > time.time()],
+                  timeout=None)
+        bump_feed_version()
+    return cache.get(FEED_VERSION_KEY)
+
+
+def schedule_feed_change(when: datetime) -> None:
+    """Запоминает момент, когда лента изменится сама по себе."""
+    cache = page_cache()
+    schedule = cache.get(FEED_SCHEDULE_KEY) or []
+    moment = when.timestamp()
+    if moment > time.time() and moment not in schedule:
+        cache.set(FEED_SCHEDULE_KEY, sorted((*schedule, moment)),
+                  timeout=None)
+
+
+def bump_feed_version() -> None:
+    """Делает недействительными все закэшированные страницы ленты."""
+    cache = page_cache()
+    try:
+        cache.incr(FEED_VERSION_KEY)
+    except ValueError:
+        cache.add(FEED_VERSION_KEY, int(time.time() * 1000), timeout=None)
+    cache.set(FEED_CHANGED_KEY, True,
+              timeout=settings.BLOG_PRIMARY_STICKY_SECONDS)
+
+
+def is_feed_settled() -> bool:
+    """
+    Можно ли связывать прочитанные данные с текущей версией ленты. Сразу
+    после ее смены реплика может еще отдавать прежние данные: такую
+    страницу нельзя кэшировать и помечать ETag новой версии, иначе
+    устаревшая копия жила бы до следующего изменения.
+    """
+    return (not settings.BLOG_DB_REPLICAS
+            or is_primary_forced()
+            or page_cache().get(FEED_CHANGED_KEY) is None)
+
+
+async def ais_feed_settled() -> bool:
+    """Асинхронный аналог is_feed_settled."""
+    return (not settings.BLOG_DB_REPLICAS
+            or is_primary_forced()
+            or await page_cache().aget(FEED_CHANGED_KEY) is None)
+
+
+def can_cache_page(request, is_anonymous: bool) -> bool:
+    """Кэшируются только GET-запросы анонимных пользователей."""
+    return (request.method == 'GET' and is_anonymous
+            and bool(settings.BLOG_PAGE_CACHE_TIMEOUT))
+
+
+def store_page(key: str, response) -> None:
+    """Кэширует отрисованный ответ целиком, как cache_page."""
+    if response.status_code == 200:
+        page_cache().set(key, response, settings.BLOG_PAGE_CACHE_TIMEOUT)
+
+
+def get_page_path(request) -> str:
+    """
+    Путь страницы с параметрами из PAGE_PARAMS. Остальные параметры на
+    страницу не влияют и не должны плодить записи в кэше.
+    """
+    query = urlencode([(name, request.GET[name]) for name in PAGE_PARAMS
+                       if name in request.GET])
+    return f'{request.path}?{query}' if query else request.path
+
+
+def get_page_key(request) -> str:
+    path = hashlib.md5(get_page_path(request).encode()).hexdigest()
+    return f'blog:page:{get_feed_version()}:{path}'
+
+
+def get_page_etag(request, *args, **kwargs) -> Optional[str]:
+    """
+    Возвращает ETag страниц ленты и постов: из версии ленты (она меняется
+    и при публикации отложенных постов) и пользователя, которому отдается
+    страница. Пока реплики догоняют новую версию, ETag не выдается.
+    """
+    if not is_feed_settled():
+        return None
+    user = request.user.pk if request.user.is_authenticated else 'anonymous'
+    validator = f'{get_feed_version()}:{user}:{get_page_path(request)}'
+    return hashlib.md5(validator.encode()).hexdigest()
@@ -1,3 +1,9 @@
 MAX_LENGTH_STRING: int = 256
 COMMENT_DISPLAY_LENGTH: int = 30
 OBJECTS_ON_PAGE: int = 10
+COMMENTS_ON_PAGE: int = 50
+IMAGE_RENDITION_WIDTHS: tuple = (320, 640, 1280)
+IMAGE_RENDITION_FORMATS: dict = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+IMAGE_RENDITION_QUALITY: int = 80
+EXCERPT_WORDS: int = 10
+RENDER_BATCH_SIZE: int = 500
@@ -0,0 +1,18 @@
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Настраивает новое подключение к SQLite: WAL позволяет читать во время
+    записи, synchronous=NORMAL убирает лишний fsync на каждый коммит.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = dict(settings.SQLITE_PRAGMAS)
+    if connection.is_in_memory_db():
+        # Для БД в памяти WAL и mmap не применимы.
+        pragmas.pop('journal_mode', None)
+        pragmas.pop('mmap_size', None)
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
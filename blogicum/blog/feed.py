@@ -0,0 +1,60 @@
+"""Синхронизация таблицы FeedEntry с постами, категориями и комментариями."""
+from typing import List
+
+from django.db.models import F
+
+from blog.models import FeedEntry, Post
+
+ENTRY_FIELDS = ('category', 'author', 'pub_date', 'is_visible',
+                'comment_count')
+
+
+def sync_feed_entries(posts, batch_size: int = 1000) -> int:
+    """Создает или обновляет записи ленты для постов из queryset posts."""
+    rows = posts.values_list('pk', 'category_id', 'author_id', 'pub_date',
+                             'is_published', 'category__is_published',
+                             'comment_count')
+    entries = [
+        FeedEntry(post_id=pk, category_id=category_id, author_id=author_id,
+                  pub_date=pub_date,
+                  is_visible=bool(is_published and category_is_published),
+                  comment_count=comment_count)
+        for (pk, category_id, author_id, pub_date, is_published,
+             category_is_published, comment_count) in rows.iterator()
+    ]
+    FeedEntry.objects.bulk_create(
+        entries, batch_size=batch_size, update_conflicts=True,
+        unique_fields=('post',),
+        update_fields=ENTRY_FIELDS,
+    )
+    return len(entries)
+
+
+def sync_post_entries(post_ids: List[int]) -> None:
+    sync_feed_entries(Post.objects.filter(pk__in=post_ids))
+
+
+def sync_category_entries(category) -> None:
+    """Видимость постов категории после ее публикации или скрытия."""
+    entries = FeedEntry.objects.filter(category=category)
+    if not category.is_published:
+        entries.filter(is_visible=True).update(is_visible=False)
+        return
+    entries.filter(is_visible=False,
+                   post__is_published=True).update(is_visible=True)
+
+
+def sync_entry_visibility(entries) -> int:
+    """
+    Открывает скрытые записи видимых постов: нужно, когда пост сохранен
+    раньше своей категории (например, при импорте пачками).
+    """
+    return entries.filter(is_visible=False,
+                          post__is_published=True,
+                          category__is_published=True).update(is_visible=True)
+
+
+def change_entry_comment_count(post_id: int, delta: int) -> None:
+    FeedEntry.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta
+    )
@@ -0,0 +1,219 @@
+"""Генератор синтетических данных для разработки и бенчмарков."""
+import random
+from collections import Counter
+from datetime import timedelta
+from typing import List, Optional
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from blog.cache import bump_feed_version
+from blog.feed import sync_feed_entries
+from blog.models import Category, Comment, Location, Post
+from blog.rendering import save_rendered
+from blog.search import index_posts
+from blog.transfer import keep_timestamps
+from blog.utils import make_excerpt
+
+User = get_user_model()
+
+WORDS = (
+    'город река море горы лес поле дорога поезд самолет машина дом улица '
+    'парк школа работа друг семья отпуск путешествие фотография книга '
+    'музыка кино театр выставка музей история погода солнце дождь снег '
+    'зима весна лето осень утро вечер ночь праздник подарок кофе чай обед '
+    'ужин рецепт спорт футбол бег велосипед прогулка собака кошка птица'
+).split()
+ENDINGS = ('', 'а', 'ы', 'у', 'ом', 'ами', 'ах', 'е')
+
+# Показатель распределения Парето: чем он меньше, тем тяжелее хвост.
+COMMENTS_ALPHA = 1.5
+# Доли скрытых объектов.
+HIDDEN_CATEGORY_SHARE = 0.1
+HIDDEN_POST_SHARE = 0.05
+# Доля постов без места.
+NO_LOCATION_SHARE = 0.5
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) + rng.choice(ENDINGS)
+                    for _ in range(words))
+
+
+def get_comment_count(rng: random.Random, mean: float,
+                      limit: int) -> int:
+    """
+    Случайное число комментариев со средним mean. Величина X - 1, где
+    X ~ Pareto(alpha), имеет среднее 1 / (alpha - 1).
+    """
+    value = (rng.paretovariate(COMMENTS_ALPHA) - 1) * (COMMENTS_ALPHA - 1)
+    return min(int(value * mean), limit)
+
+
+class DataGenerator:
+    """Создает синтетические данные пачками по batch_size объектов."""
+
+    def __init__(self, prefix: str = 'gen', seed: int = 0,
+                 batch_size: int = 5000, password: Optional[str] = None,
+                 days: int = 365, scheduled_days: int = 30):
+        self.prefix = prefix
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.password = password
+        self.days = days
+        self.scheduled_days = scheduled_days
+        self.now = timezone.now()
+        self.counts = Counter()
+        self.user_ids: List[int] = []
+        self.category_ids: List[int] = []
+        self.location_ids: List[int] = []
+
+    def check_prefix(self) -> None:
+        if (User.objects.filter(username__startswith=f'{self.prefix}_')
+                .exists()
+                or Category.objects.filter(slug__startswith=f'{self.prefix}-')
+                .exists()):
+            raise ValueError(
+                f'Данные с префиксом {self.prefix} уже есть, '
+                f'выберите другой префикс.'
+            )
+
+    def create_users(self, total: int) -> None:
+        # Хэш пароля медленный, поэтому считается один раз на всех.
+        password = (make_password(self.password) if self.password
+                    else make_password(None))
+        users = [
+            User(username=f'{self.prefix}_{number}',
+                 first_name=self.rng.choice(WORDS).title(),
+                 password=password)
+            for number in range(1, total + 1)
+        ]
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        self.user_ids = [user.pk for user in users]
+        self.counts['users'] = total
+
+    def create_categories(self, total: int) -> None:
+        categories = [
+            Category(title=make_text(self.rng, 2).capitalize(),
+                     description=make_text(self.rng, 15),
+                     slug=f'{self.prefix}-{number}',
+                     is_published=(self.rng.random()
+                                   >= HIDDEN_CATEGORY_SHARE))
+            for number in range(1, total + 1)
+        ]
+        Category.objects.bulk_create(categories, batch_size=self.batch_size)
+        self.category_ids = [category.pk for category in categories]
+        self.counts['categories'] = total
+
+    def create_locations(self, total: int) -> None:
+        locations = [Location(name=self.rng.choice(WORDS).title())
+                     for _ in range(total)]
+        Location.objects.bulk_create(locations, batch_size=self.batch_size)
+        self.location_ids = [location.pk for location in locations]
+        self.counts['locations'] = total
+
+    def make_pub_date(self, scheduled_share: float):
+        if self.rng.random() < scheduled_share:
+            return self.now + timedelta(
+                seconds=self.rng.uniform(60, self.scheduled_days * 86400)
+            )
+        return self.now - timedelta(
+            seconds=self.rng.uniform(0, self.days * 86400)
+        )
+
+    def make_post(self, scheduled_share: float) -> Post:
+        pub_date = self.make_pub_date(scheduled_share)
+        created_at = min(pub_date, self.now)
+        location_id = None
+        if self.location_ids and self.rng.random() >= NO_LOCATION_SHARE:
+            location_id = self.rng.choice(self.location_ids)
+        text = make_text(self.rng, self.rng.randint(20, 200))
+        return Post(
+            title=make_text(self.rng, 5).capitalize(),
+            text=text,
+            excerpt=make_excerpt(text),
+            pub_date=pub_date,
+            created_at=created_at,
+            updated_at=created_at,
+            author_id=self.rng.choice(self.user_ids),
+            category_id=(self.rng.choice(self.category_ids)
+                         if self.category_ids else None),
+            location_id=location_id,
+            is_published=self.rng.random() >= HIDDEN_POST_SHARE,
+            is_live=pub_date <= self.now,
+        )
+
+    def make_comments(self, post: Post, total: int):
+        for _ in range(total):
+            yield Comment(
+                text=make_text(self.rng, self.rng.randint(3, 40)),
+                author_id=self.rng.choice(self.user_ids),
+                post_id=post.pk,
+                created_at=post.pub_date + timedelta(
+                    seconds=self.rng.uniform(
+                        0, (self.now - post.pub_date).total_seconds()
+                    )
+                ),
+            )
+
+    def create_posts(self, total: int, comments_per_post: float,
+                     max_comments: int, scheduled_share: float) -> None:
+        for start in range(0, total, self.batch_size):
+            size = min(self.batch_size, total - start)
+            with transaction.atomic():
+                posts = [self.make_post(scheduled_share)
+                         for _ in range(size)]
+                # У отложенных постов комментариев еще нет.
+                for post in posts:
+                    post.comment_count = (
+                        get_comment_count(self.rng, comments_per_post,
+                                          max_comments)
+                        if post.is_live else 0
+                    )
+                with keep_timestamps(Post):
+                    Post.objects.bulk_create(posts)
+                self.create_comments(posts)
+                sync_feed_entries(
+                    Post.objects.filter(pk__in=[post.pk for post in posts])
+                )
+                index_posts(posts)
+                save_rendered(Post, posts)
+            self.counts['posts'] += size
+
+    def create_comments(self, posts: List[Post]) -> None:
+        comments = []
+        with keep_timestamps(Comment):
+            for post in posts:
+                comments.extend(self.make_comments(post, post.comment_count))
+                if len(comments) >= self.batch_size:
+                    Comment.objects.bulk_create(comments)
+                    save_rendered(Comment, comments)
+                    self.counts['comments'] += len(comments)
+                    comments = []
+            Comment.objects.bulk_create(comments)
+            save_rendered(Comment, comments)
+        self.counts['comments'] += len(comments)
+
+
+def generate_data(users: int = 100, categories: int = 10,
+                  locations: int = 20, posts: int = 1000,
+                  comments_per_post: float = 5.0, max_comments: int = 5000,
+                  scheduled_share: float = 0.05, **options) -> Counter:
+    """
+    Создает набор данных заданного размера и возвращает количество
+    созданных объектов. options передаются в DataGenerator.
+    """
+    if users < 1:
+        raise ValueError('Нужен хотя бы один пользователь.')
+    generator = DataGenerator(**options)
+    generator.check_prefix()
+    with transaction.atomic():
+        generator.create_users(users)
+        generator.create_categories(categories)
+        generator.create_locations(locations)
+    generator.create_posts(posts, comments_per_post, max_comments,
+                           scheduled_share)
+    bump_feed_version()
+    return generator.counts
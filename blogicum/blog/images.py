@@ -0,0 +1,140 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+from typing import Dict
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import ExifTags, Image, ImageOps, UnidentifiedImageError
+
+from blog.cache import bump_feed_version
+from blog.constants import (IMAGE_RENDITION_FORMATS, IMAGE_RENDITION_QUALITY,
+                            IMAGE_RENDITION_WIDTHS)
+from blog.models import Post
+
+
+def get_rendition_widths(original_width: int) -> list:
+    """Ширины уменьшенных копий; картинку никогда не увеличиваем."""
+    widths = [w for w in IMAGE_RENDITION_WIDTHS if w < original_width]
+    widths.append(min(original_width, IMAGE_RENDITION_WIDTHS[-1]))
+    return sorted(set(widths))
+
+
+def strip_exif(image: Image.Image) -> Image.Image:
+    """
+    Поворачивает картинку согласно EXIF. Pillow не переносит EXIF при
+    сохранении, если его не передать явно, поэтому копия будет без него.
+    """
+    image = ImageOps.exif_transpose(image)
+    image.load()
+    image.info.pop('exif', None)
+    return image
+
+
+def strip_jpeg_exif(data: bytes) -> bytes:
+    """Вырезает из JPEG сегменты APP1 с EXIF, не перекодируя изображение."""
+    parts = [data[:2]]
+    position = 2
+    while position + 4 <= len(data) and data[position] == 0xFF:
+        marker = data[position + 1]
+        if marker == 0xFF:
+            # Байт-заполнитель перед маркером.
+            position += 1
+            continue
+        if marker == 0xDA:
+            # Начало сжатых данных, дальше сегментов метаданных нет.
+            break
+        length = int.from_bytes(data[position + 2:position + 4], 'big')
+        segment = data[position:position + 2 + length]
+        if not (marker == 0xE1 and segment[4:10] == b'Exif\x00\x00'):
+            parts.append(segment)
+        position += 2 + length
+    parts.append(data[position:])
+    return b''.join(parts)
+
+
+def get_rendition_names(renditions: Dict) -> list:
+    return [name
+            for sizes in renditions.get('formats', {}).values()
+            for name in sizes.values()]
+
+
+def delete_renditions(renditions: Dict, storage) -> None:
+    for name in get_rendition_names(renditions):
+        storage.delete(name)
+
+
+def build_renditions(post: Post) -> Dict:
+    """
+    Сохраняет рядом с оригиналом уменьшенные копии изображения поста
+    во всех форматах из IMAGE_RENDITION_FORMATS. Если в оригинале есть
+    EXIF, сохраняет копию оригинала без него под новым именем (source);
+    сам оригинал не трогает. Возвращает описание для Post.image_renditions.
+    """
+    storage = post.image.storage
+    name = post.image.name
+    with storage.open(name) as file:
+        data = file.read()
+    original = Image.open(BytesIO(data))
+    exif = original.getexif()
+    image = strip_exif(original)
+
+    if exif:
+        if (original.format == 'JPEG'
+                and exif.get(ExifTags.Base.Orientation, 1) == 1):
+            # Поворачивать не нужно: EXIF вырезается без перекодирования.
+            content = strip_jpeg_exif(data)
+        else:
+            buffer = BytesIO()
+            image.save(buffer, format=original.format)
+            content = buffer.getvalue()
+        name = storage.save(name, ContentFile(content))
+
+    rgb_image = image.convert('RGB')
+    path = PurePosixPath(name)
+    renditions = {'source': name, 'formats': {}}
+    for extension, image_format in IMAGE_RENDITION_FORMATS.items():
+        sizes = {}
+        for width in get_rendition_widths(image.width):
+            height = round(image.height * width / image.width)
+            buffer = BytesIO()
+            rgb_image.resize((width, height), Image.Resampling.LANCZOS).save(
+                buffer, format=image_format, quality=IMAGE_RENDITION_QUALITY
+            )
+            sizes[str(width)] = storage.save(
+                str(path.parent / 'renditions' / f'{path.stem}_{width}.'
+                    f'{extension}'),
+                ContentFile(buffer.getvalue()),
+            )
+        renditions['formats'][extension] = sizes
+    return renditions
+
+
+def process_post_image(post_id: int) -> None:
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    storage = post.image.storage
+    name = post.image.name
+    old_renditions = post.image_renditions
+    try:
+        renditions = build_renditions(post)
+    except (OSError, UnidentifiedImageError):
+        # Файл удален или не является изображением: показываем оригинал.
+        return
+    updated = Post.objects.filter(pk=post_id, image=name).update(
+        image=renditions['source'],
+        image_renditions=renditions,
+        updated_at=timezone.now(),
+    )
+    # Файл без EXIF сохранен под новым именем; удаляется та копия, на
+    # которую пост больше не ссылается.
+    if not updated:
+        # Пока шла обработка, изображение поста успели заменить.
+        delete_renditions(renditions, storage)
+        if renditions['source'] != name:
+            storage.delete(renditions['source'])
+        return
+    if renditions['source'] != name:
+        storage.delete(name)
+    delete_renditions(old_renditions, storage)
+    bump_feed_version()
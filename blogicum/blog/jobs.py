@@ -0,0 +1,129 @@
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from blog.models import Job
+from blog.routers import use_primary
+
+REGISTRY: Dict[str, Callable] = {}
+
+
+def job(func: Callable) -> Callable:
+    """Регистрирует функцию как задачу, которую можно поставить в очередь."""
+    REGISTRY[f'{func.__module__}.{func.__name__}'] = func
+    return func
+
+
+def get_job_name(func: Callable) -> str:
+    name = f'{func.__module__}.{func.__name__}'
+    if name not in REGISTRY:
+        raise ValueError(f'Функция {name} не зарегистрирована как задача.')
+    return name
+
+
+class ImmediateBackend:
+    """
+    Выполняет задачу сразу, в текущем процессе. Задачи на будущее время
+    пропускаются: отложенные посты появляются в ленте по дате публикации.
+    """
+
+    def enqueue(self, name: str, args: list, run_at: datetime,
+                max_attempts: int) -> None:
+        if run_at <= timezone.now():
+            REGISTRY[name](*args)
+
+
+class DatabaseBackend:
+    """Сохраняет задачу в таблицу Job; выполняет ее команда run_jobs."""
+
+    def enqueue(self, name: str, args: list, run_at: datetime,
+                max_attempts: int) -> Job:
+        return Job.objects.create(name=name, args=args, run_at=run_at,
+                                  max_attempts=max_attempts)
+
+
+def get_backend():
+    return import_string(settings.BLOG_JOB_BACKEND)()
+
+
+def enqueue(func: Callable, *args, run_at: Optional[datetime] = None,
+            max_attempts: int = 3):
+    """Ставит зарегистрированную задачу func(*args) в очередь."""
+    return get_backend().enqueue(get_job_name(func), list(args),
+                                 run_at or timezone.now(), max_attempts)
+
+
+def enqueue_once(func: Callable, *args, run_at: Optional[datetime] = None,
+                 max_attempts: int = 3):
+    """
+    Как enqueue, но не ставит задачу, если такая же задача на то же время
+    уже ждет в очереди.
+    """
+    run_at = run_at or timezone.now()
+    if Job.objects.filter(name=get_job_name(func), args=list(args),
+                          run_at=run_at, status=Job.PENDING).exists():
+        return None
+    return enqueue(func, *args, run_at=run_at, max_attempts=max_attempts)
+
+
+def claim_job() -> Optional[Job]:
+    """
+    Забирает одну готовую к выполнению задачу. Задачи, зависшие у упавшего
+    обработчика дольше BLOG_JOB_LOCK_TIMEOUT, забираются повторно.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.BLOG_JOB_LOCK_TIMEOUT)
+    claimable = (Q(status=Job.PENDING, run_at__lte=now)
+                 | Q(status=Job.RUNNING, locked_at__lt=stale))
+    for pk in Job.objects.filter(claimable).values_list('pk', flat=True)[:10]:
+        # Задачу мог забрать другой обработчик: побеждает тот, чей UPDATE
+        # изменил строку.
+        claimed = Job.objects.filter(claimable, pk=pk).update(
+            status=Job.RUNNING, locked_at=now
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job_instance: Job) -> None:
+    job_instance.attempts += 1
+    try:
+        # Задача могла быть поставлена только что: реплики ее данные
+        # еще не видят.
+        with use_primary(), transaction.atomic():
+            REGISTRY[job_instance.name](*job_instance.args)
+    except Exception:
+        job_instance.last_error = traceback.format_exc()
+        if job_instance.attempts < job_instance.max_attempts:
+            job_instance.status = Job.PENDING
+            job_instance.run_at = timezone.now() + timedelta(
+                seconds=settings.BLOG_JOB_RETRY_DELAY
+                * 2 ** (job_instance.attempts - 1)
+            )
+        else:
+            job_instance.status = Job.FAILED
+    else:
+        job_instance.status = Job.DONE
+        job_instance.last_error = ''
+    job_instance.locked_at = None
+    job_instance.save(update_fields=('status', 'attempts', 'run_at',
+                                     'locked_at', 'last_error'))
+
+
+def run_pending_jobs(limit: Optional[int] = None) -> int:
+    """Выполняет готовые задачи, пока они есть. Возвращает их количество."""
+    done = 0
+    while limit is None or done < limit:
+        job_instance = claim_job()
+        if job_instance is None:
+            break
+        run_job(job_instance)
+        done += 1
+    return done
@@ -0,0 +1,51 @@
+import base64
+from email.mime.base import MIMEBase
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.utils.encoding import force_bytes
+
+from blog.jobs import enqueue
+from blog.tasks import send_email
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Вместо отправки ставит каждое письмо в фоновую очередь, чтобы
+    запрос не ждал SMTP. Вложения передаются задаче в base64; письма с
+    готовыми MIME-частями в JSON не сохранить, и они отправляются сразу.
+    """
+
+    def send_messages(self, email_messages):
+        direct = []
+        for message in email_messages:
+            if any(isinstance(attachment, MIMEBase)
+                   for attachment in message.attachments):
+                direct.append(message)
+                continue
+            enqueue(send_email, {
+                'subject': message.subject,
+                'body': message.body,
+                'from_email': message.from_email,
+                'to': message.to,
+                'cc': message.cc,
+                'bcc': message.bcc,
+                'reply_to': message.reply_to,
+                'headers': message.extra_headers,
+                'alternatives': [
+                    list(alternative)
+                    for alternative in getattr(message, 'alternatives', ())
+                ],
+                'attachments': [
+                    [filename, base64.b64encode(force_bytes(content)).decode(),
+                     mimetype]
+                    for filename, content, mimetype in message.attachments
+                ],
+                'content_subtype': message.content_subtype,
+            })
+        if direct:
+            get_connection(
+                settings.BLOG_EMAIL_BACKEND, fail_silently=self.fail_silently
+            ).send_messages(direct)
+        return len(email_messages)
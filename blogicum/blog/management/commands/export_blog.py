@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from blog.transfer import export_objects
+
+
+class Command(BaseCommand):
+    help = ('Выгружает категории, местоположения, посты и комментарии '
+            'в формате JSON Lines (по объекту на строку).')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output',
+            nargs='?',
+            default='-',
+            help='Файл выгрузки; по умолчанию — стандартный вывод.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options['output'] == '-':
+            # Сериализатор сам разделяет строки, как и в dumpdata.
+            self.stdout.ending = None
+            counts = export_objects(self.stdout, options['batch_size'],
+                                    options['database'])
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                counts = export_objects(stream, options['batch_size'],
+                                        options['database'])
+        for label, count in counts.items():
+            self.stderr.write(f'{label}: {count}')
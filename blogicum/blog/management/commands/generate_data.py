@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.generator import generate_data
+
+
+class Command(BaseCommand):
+    help = ('Создает синтетические данные через bulk_create: пользователей, '
+            'категории, места, посты (часть — отложенные) и комментарии, '
+            'число которых к посту распределено с тяжелым хвостом.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--locations', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument(
+            '--comments-per-post',
+            type=float,
+            default=5.0,
+            help='Среднее число комментариев к опубликованному посту.',
+        )
+        parser.add_argument(
+            '--max-comments',
+            type=int,
+            default=5000,
+            help='Наибольшее число комментариев к одному посту.',
+        )
+        parser.add_argument(
+            '--scheduled-share',
+            type=float,
+            default=0.05,
+            help='Доля отложенных постов с датой публикации в будущем.',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='За сколько дней в прошлом распределены даты постов.',
+        )
+        parser.add_argument(
+            '--prefix',
+            default='gen',
+            help='Префикс имен пользователей и slug категорий.',
+        )
+        parser.add_argument(
+            '--password',
+            help='Пароль пользователей; по умолчанию войти под ними нельзя.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        try:
+            counts = generate_data(
+                users=options['users'],
+                categories=options['categories'],
+                locations=options['locations'],
+                posts=options['posts'],
+                comments_per_post=options['comments_per_post'],
+                max_comments=options['max_comments'],
+                scheduled_share=options['scheduled_share'],
+                days=options['days'],
+                prefix=options['prefix'],
+                password=options['password'],
+                seed=options['seed'],
+                batch_size=options['batch_size'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        for name, count in counts.items():
+            self.stdout.write(f'{name}: {count}')
+        self.stdout.write(self.style.SUCCESS('Данные созданы.'))
@@ -0,0 +1,46 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from blog.transfer import import_objects
+
+
+class Command(BaseCommand):
+    help = ('Загружает выгрузку export_blog пачками через bulk_create. '
+            'Объекты сохраняются с исходными id, отсутствующие авторы '
+            'создаются без пароля. Файлы изображений не переносятся.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'input',
+            nargs='?',
+            default='-',
+            help='Файл выгрузки; по умолчанию — стандартный ввод.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--no-create-users',
+            action='store_false',
+            dest='create_users',
+            help='Не создавать отсутствующих авторов, а прервать импорт.',
+        )
+
+    def handle(self, *args, **options):
+        import_options = {
+            'batch_size': options['batch_size'],
+            'using': options['database'],
+            'create_users': options['create_users'],
+        }
+        try:
+            if options['input'] == '-':
+                counts = import_objects(sys.stdin, **import_options)
+            else:
+                with open(options['input'], encoding='utf-8') as stream:
+                    counts = import_objects(stream, **import_options)
+        except ValueError as error:
+            raise CommandError(error)
+        for label, count in counts.items():
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(self.style.SUCCESS('Импорт завершен.'))
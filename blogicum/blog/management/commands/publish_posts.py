@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from blog.publishing import get_next_publication, publish_due_posts
+
+
+class Command(BaseCommand):
+    help = ('Публикует отложенные посты, дата публикации которых '
+            'наступила. Подходит для периодического запуска по cron.')
+
+    def handle(self, *args, **options):
+        post_ids = publish_due_posts()
+        self.stdout.write(
+            self.style.SUCCESS(f'Опубликовано постов: {len(post_ids)}.')
+        )
+        next_publication = get_next_publication()
+        if next_publication is not None:
+            self.stdout.write(
+                f'Следующая публикация: {next_publication:%Y-%m-%d %H:%M}.'
+            )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from blog.feed import sync_feed_entries
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает записи ленты (FeedEntry) для всех публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Количество публикаций, обрабатываемых за один раз.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = Post.objects.order_by('pk')
+        last_pk = 0
+        synced = 0
+        while True:
+            pks = list(posts.filter(pk__gt=last_pk)
+                       .values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            synced += sync_feed_entries(Post.objects.filter(pk__in=pks))
+            last_pk = pks[-1]
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено записей ленты: {synced}.')
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from blog.models import Post
+from blog.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество публикаций, индексируемых за один раз.',
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Псевдоним БД, индекс которой перестраивается.',
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        with transaction.atomic(using=connection.alias):
+            indexed = rebuild_index(Post, connection,
+                                    options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано публикаций: {indexed}.')
+        )
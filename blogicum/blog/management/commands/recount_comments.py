@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, FeedEntry, Post
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает поле comment_count у всех публикаций и их '
+            'записей ленты.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Количество публикаций, обновляемых одним запросом.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        comments = (Comment.objects
+                    .filter(post=OuterRef('pk'))
+                    .order_by()
+                    .values('post')
+                    .annotate(total=Count('pk'))
+                    .values('total'))
+        last_pk = 0
+        updated = 0
+        while True:
+            pks = list(Post.objects
+                       .filter(pk__gt=last_pk)
+                       .order_by('pk')
+                       .values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            updated += Post.objects.filter(pk__in=pks).update(
+                comment_count=Coalesce(Subquery(comments), 0)
+            )
+            FeedEntry.objects.filter(pk__in=pks).update(
+                comment_count=Subquery(Post.objects
+                                       .filter(pk=OuterRef('pk'))
+                                       .values('comment_count'))
+            )
+            last_pk = pks[-1]
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано публикаций: {updated}.')
+        )
@@ -0,0 +1,67 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from blog.jobs import run_pending_jobs
+from blog.publishing import publish_due_posts
+
+
+def work(sleep: float, once: bool) -> None:
+    """Цикл одного процесса-обработчика."""
+    while True:
+        # Посты, созданные в обход save() (миграция, bulk_create генератора
+        # и импорта), не ставят задачу публикации, поэтому наступившие
+        # проверяются при каждом опросе очереди.
+        publish_due_posts()
+        done = run_pending_jobs()
+        close_old_connections()
+        if once:
+            return
+        if not done:
+            time.sleep(sleep)
+
+
+class Command(BaseCommand):
+    help = 'Выполняет задачи фоновой очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Количество процессов-обработчиков.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Пауза между проверками пустой очереди, с.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить готовые задачи и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        if processes == 1:
+            work(options['sleep'], options['once'])
+            return
+        # Дочерние процессы не должны наследовать подключения к БД.
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=work,
+                                    args=(options['sleep'], options['once']))
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
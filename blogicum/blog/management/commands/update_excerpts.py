@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.utils import update_excerpts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает анонсы (Post.excerpt) всех публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Количество публикаций, обрабатываемых за один раз.',
+        )
+
+    def handle(self, *args, **options):
+        updated = update_excerpts(Post, batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено анонсов: {updated}.')
+        )
@@ -0,0 +1,208 @@
+import mimetypes
+import os
+from urllib.parse import unquote, urlsplit
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from blog.routers import choose_replica, primary_flag, request_replica
+from blog.staticfiles import ENCODING_SUFFIXES
+
+# Файлы с хэшем содержимого в имени не меняются, кэш на год.
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Отправляет в основную БД запросы, которые пишут данные, и страницы,
+    где устаревшие данные недопустимы (атрибут use_primary_db у view).
+    После записи ставит короткоживущую cookie, чтобы автор сразу увидел
+    свои изменения, пока реплики догоняют основную БД. Все чтения одного
+    запроса идут в одну реплику.
+    """
+
+    safe_methods = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            # Под ASGI цепочка и process_view остаются асинхронными, чтобы
+            # Django не переключал запрос в поток ради этой middleware.
+            markcoroutinefunction(self)
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = primary_flag.set(self.needs_primary(request))
+        replica_token = request_replica.set(choose_replica())
+        try:
+            response = self.get_response(request)
+        finally:
+            request_replica.reset(replica_token)
+            primary_flag.reset(token)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        token = primary_flag.set(self.needs_primary(request))
+        replica_token = request_replica.set(choose_replica())
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_replica.reset(replica_token)
+            primary_flag.reset(token)
+        return self.process_response(request, response)
+
+    def needs_primary(self, request) -> bool:
+        return (request.method not in self.safe_methods
+                or settings.BLOG_PRIMARY_STICKY_COOKIE in request.COOKIES)
+
+    def process_response(self, request, response):
+        if (request.method not in self.safe_methods
+                and settings.BLOG_DB_REPLICAS):
+            response.set_cookie(
+                settings.BLOG_PRIMARY_STICKY_COOKIE, '1',
+                max_age=settings.BLOG_PRIMARY_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', view_func)
+        if getattr(view_class, 'use_primary_db', False):
+            primary_flag.set(True)
+
+    async def aprocess_view(self, request, view_func, view_args,
+                            view_kwargs):
+        self.process_view(request, view_func, view_args, view_kwargs)
+
+
+def get_accepted_encodings(header: str) -> set:
+    """Кодировки из Accept-Encoding, кроме отключенных через q=0."""
+    encodings = set()
+    for item in header.split(','):
+        encoding, *params = (part.strip() for part in item.split(';'))
+        if not encoding:
+            continue
+        try:
+            quality = next((float(param[2:]) for param in params
+                            if param.startswith('q=')), 1)
+        except ValueError:
+            continue
+        if quality > 0:
+            encodings.add(encoding.lower())
+    return encodings
+
+
+class StaticFilesMiddleware:
+    """
+    Отдает собранную collectstatic статику из STATIC_ROOT без отдельного
+    веб-сервера (см. blog/staticfiles.py). Если клиент принимает сжатие и
+    есть сжатая копия, отдается она с Content-Encoding. Файлы с хэшем в
+    имени кэшируются навсегда, остальные — на BLOG_STATIC_MAX_AGE секунд
+    с проверкой по Last-Modified. Неизвестные пути передаются дальше.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.prefix = urlsplit(settings.STATIC_URL).path
+        self.hashed_names = set()
+        self.manifest_mtime = None
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.serve_static(request)
+        if response is not None:
+            return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        response = self.serve_static(request)
+        if response is not None:
+            return response
+        return await self.get_response(request)
+
+    def serve_static(self, request):
+        if (request.method in ('GET', 'HEAD')
+                and request.path.startswith(self.prefix)):
+            return self.serve(request,
+                              unquote(request.path[len(self.prefix):]))
+        return None
+
+    def get_hashed_names(self) -> set:
+        """
+        Имена файлов с хэшем из manifest collectstatic. Manifest
+        перечитывается, когда collectstatic запускали после старта.
+        """
+        manifest_name = getattr(staticfiles_storage, 'manifest_name', None)
+        if manifest_name is None:
+            return self.hashed_names
+        try:
+            mtime = os.stat(
+                staticfiles_storage.manifest_storage.path(manifest_name)
+            ).st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self.manifest_mtime:
+            hashed_files, _ = staticfiles_storage.load_manifest()
+            self.hashed_names = set(hashed_files.values())
+            self.manifest_mtime = mtime
+        return self.hashed_names
+
+    def serve(self, request, name: str):
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+        mtime = os.stat(path).st_mtime
+        if name in self.get_hashed_names():
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            cache_control = f'public, max-age={settings.BLOG_STATIC_MAX_AGE}'
+        accepted = get_accepted_encodings(
+            request.headers.get('Accept-Encoding', '')
+        )
+        content_encoding = None
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            if encoding in accepted and os.path.isfile(path + suffix):
+                content_encoding = encoding
+                break
+
+        if not was_modified_since(request.headers.get('If-Modified-Since'),
+                                  mtime):
+            response = HttpResponseNotModified()
+        else:
+            content_type, _ = mimetypes.guess_type(path)
+            file_path = (path + ENCODING_SUFFIXES[content_encoding]
+                         if content_encoding else path)
+            response = FileResponse(
+                open(file_path, 'rb'),
+                content_type=content_type or 'application/octet-stream',
+            )
+            if content_encoding:
+                response.headers['Content-Encoding'] = content_encoding
+        response.headers['Last-Modified'] = http_date(mtime)
+        response.headers['Cache-Control'] = cache_control
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
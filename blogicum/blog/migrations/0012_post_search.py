@@ -0,0 +1,95 @@
+# Generated by Django 4.2.16 on 2026-10-18 04:51
+
+import re
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+import snowballstemmer
+from django.core.exceptions import ImproperlyConfigured
+from django.db import migrations, models
+
+# DDL и заполнение индекса на момент миграции (см. blog/search.py).
+SEARCH_TABLE = 'blog_post_search'
+CREATE_SQL = {
+    'sqlite': (
+        f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+        f"title, text, tokenize = 'unicode61 remove_diacritics 0')",
+    ),
+    'postgresql': (
+        f'CREATE TABLE {SEARCH_TABLE} ('
+        f'rowid bigint PRIMARY KEY REFERENCES blog_post (id) '
+        f'ON DELETE CASCADE, '
+        f'document tsvector NOT NULL)',
+        f'CREATE INDEX {SEARCH_TABLE}_document_idx '
+        f'ON {SEARCH_TABLE} USING GIN (document)',
+        f'INSERT INTO {SEARCH_TABLE} (rowid, document) '
+        f"SELECT id, setweight(to_tsvector('russian', title), 'A') "
+        f"|| setweight(to_tsvector('russian', text), 'B') FROM blog_post",
+    ),
+}
+WORD_RE = re.compile(r'\w+')
+BATCH_SIZE = 5000
+
+
+def fill_sqlite_index(Post, connection):
+    # У FTS5 нет русского стеммера: в индекс пишутся основы слов.
+    stemmer = snowballstemmer.stemmer('russian')
+
+    def to_document(text):
+        words = WORD_RE.findall(text.lower().replace('ё', 'е'))
+        return ' '.join(stemmer.stemWords(words))
+
+    posts = Post.objects.using(connection.alias).order_by('pk')
+    last_pk = 0
+    with connection.cursor() as cursor:
+        while True:
+            rows = list(posts.filter(pk__gt=last_pk)
+                        .values_list('pk', 'title', 'text')[:BATCH_SIZE])
+            if not rows:
+                break
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+                f'VALUES (%s, %s, %s)',
+                [(pk, to_document(title), to_document(text))
+                 for pk, title, text in rows],
+            )
+            last_pk = rows[-1][0]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in CREATE_SQL:
+        raise ImproperlyConfigured(
+            f'Полнотекстовый поиск не поддерживается для {vendor}.'
+        )
+    for sql in CREATE_SQL[vendor]:
+        schema_editor.execute(sql)
+    if vendor == 'sqlite':
+        fill_sqlite_index(apps.get_model('blog', 'Post'),
+                          schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='blog.post')),
+                ('document', django.contrib.postgres.search.SearchVectorField(null=True)),
+            ],
+            options={
+                'db_table': 'blog_post_search',
+                'managed': False,
+            },
+        ),
+    ]
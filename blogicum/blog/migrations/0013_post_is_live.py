@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-18 04:58
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_is_live(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(pub_date__lte=timezone.now()).update(is_live=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_search'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_feed_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_live',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Дата публикации наступила'),
+        ),
+        migrations.RunPython(fill_is_live, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_live', True), ('is_published', True)), fields=['-pub_date'], name='post_published_feed_idx'),
+        ),
+    ]
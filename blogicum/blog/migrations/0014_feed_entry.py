@@ -0,0 +1,54 @@
+# Generated by Django 4.2.16 on 2026-10-18 05:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_feed_entries(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    FeedEntry = apps.get_model('blog', 'FeedEntry')
+    rows = (Post.objects
+            .values_list('pk', 'category_id', 'author_id', 'pub_date',
+                         'is_published', 'is_live',
+                         'category__is_published', 'comment_count')
+            .iterator())
+    FeedEntry.objects.bulk_create(
+        (FeedEntry(post_id=pk, category_id=category_id, author_id=author_id,
+                   pub_date=pub_date,
+                   is_visible=bool(is_published and is_live
+                                   and category_is_published),
+                   comment_count=comment_count)
+         for (pk, category_id, author_id, pub_date, is_published, is_live,
+              category_is_published, comment_count) in rows),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0013_post_is_live'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_entry', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата и время публикации')),
+                ('is_visible', models.BooleanField(default=False, verbose_name='Виден в ленте')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Количество комментариев')),
+                ('author', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор публикации')),
+                ('category', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'запись ленты',
+                'verbose_name_plural': 'Записи ленты',
+                'ordering': ('-pub_date',),
+                'indexes': [models.Index(condition=models.Q(('is_visible', True)), fields=['-pub_date'], name='feed_visible_idx'), models.Index(condition=models.Q(('is_visible', True)), fields=['category', '-pub_date'], name='feed_category_idx'), models.Index(fields=['author', '-pub_date'], name='feed_author_idx')],
+            },
+        ),
+        migrations.RunPython(fill_feed_entries, migrations.RunPython.noop),
+    ]
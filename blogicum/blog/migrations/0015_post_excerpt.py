@@ -0,0 +1,50 @@
+# Generated by Django 4.2.16 on 2026-10-18 05:31
+
+import re
+from itertools import islice
+
+from django.db import migrations, models
+
+# Копия blog.utils.make_excerpt на момент миграции.
+EXCERPT_WORDS = 10
+WORD_RE = re.compile(r'\S+')
+BATCH_SIZE = 500
+
+
+def make_excerpt(text):
+    words = [match.group()
+             for match in islice(WORD_RE.finditer(text), EXCERPT_WORDS + 1)]
+    if len(words) > EXCERPT_WORDS:
+        return ' '.join(words[:EXCERPT_WORDS]) + ' …'
+    return ' '.join(words)
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.using(schema_editor.connection.alias).order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)
+                     .only('pk', 'text')[:BATCH_SIZE])
+        if not batch:
+            break
+        for post in batch:
+            post.excerpt = make_excerpt(post.text)
+        posts.bulk_update(batch, ['excerpt'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_feed_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Анонс'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.16 on 2026-10-18 05:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentHTML',
+            fields=[
+                ('html', models.TextField(blank=True, verbose_name='HTML')),
+                ('version', models.PositiveSmallIntegerField(default=0, verbose_name='Версия рендерера')),
+                ('comment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rendered', serialize=False, to='blog.comment', verbose_name='Комментарий')),
+            ],
+            options={
+                'verbose_name': 'HTML комментария',
+                'verbose_name_plural': 'HTML комментариев',
+            },
+        ),
+        migrations.CreateModel(
+            name='PostHTML',
+            fields=[
+                ('html', models.TextField(blank=True, verbose_name='HTML')),
+                ('version', models.PositiveSmallIntegerField(default=0, verbose_name='Версия рендерера')),
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rendered', serialize=False, to='blog.post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'HTML публикации',
+                'verbose_name_plural': 'HTML публикаций',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 05:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_rendered_text'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_live', False)), fields=['pub_date'], name='post_scheduled_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.16 on 2026-10-18 06:09
+
+from django.db import migrations, models
+
+
+def show_scheduled_entries(apps, schema_editor):
+    # Видимость записи больше не зависит от is_live: отложенная запись
+    # появляется в ленте с наступлением pub_date.
+    FeedEntry = apps.get_model('blog', 'FeedEntry')
+    FeedEntry.objects.filter(
+        is_visible=False,
+        post__is_published=True,
+        category__is_published=True,
+    ).update(is_visible=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_post_scheduled_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_feed_idx',
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-pub_date'], name='post_published_feed_idx'),
+        ),
+        migrations.RunPython(show_scheduled_entries,
+                             migrations.RunPython.noop),
+    ]
@@ -1,9 +1,15 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.utils import timezone
+from django.utils.safestring import mark_safe
+from django_cleanup import cleanup
 
 from blog.constants import COMMENT_DISPLAY_LENGTH, MAX_LENGTH_STRING
-from blog.querysets import PostQuerySet, PublishedPostManager
+from blog.querysets import (FeedEntryQuerySet, PostQuerySet,
+                            PublishedPostManager)
+from blog.rendering import render_text
 from blog.utils import get_short_text
 
 User = get_user_model()
@@ -38,7 +44,22 @@ class PublicationBase(CreationBase):
         abstract = True
 
 
-class Post(PublicationBase):
+class RenderedTextMixin:
+    """Вывод готового HTML поля text (см. blog/rendering.py)."""
+
+    @property
+    def text_as_html(self) -> str:
+        """Еще не отрисованный текст рендерится на лету."""
+        try:
+            rendered = self.rendered
+        except ObjectDoesNotExist:
+            return mark_safe(render_text(self.text))
+        return mark_safe(rendered.html)
+
+
+# Старые файлы изображений удаляет фоновая очередь (см. blog/signals.py).
+@cleanup.ignore
+class Post(RenderedTextMixin, PublicationBase):
     title = models.CharField('Заголовок', max_length=MAX_LENGTH_STRING)
     text = models.TextField('Текст')
     pub_date = models.DateTimeField(
@@ -70,12 +91,50 @@ class Post(PublicationBase):
         upload_to='posts_images',
         blank=True
     )
+    image_renditions = models.JSONField(
+        'Уменьшенные копии изображения',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+    # Наступила ли дата публикации. Для отложенных постов флаг ставит
+    # планировщик (см. blog/publishing.py), а не сравнение с текущим
+    # временем в каждом запросе.
+    is_live = models.BooleanField(
+        'Дата публикации наступила',
+        default=False,
+        editable=False,
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    # Начало текста для карточки в ленте и списка в админке: страницы
+    # списков не загружают полный текст поста.
+    excerpt = models.TextField('Анонс', blank=True, editable=False)
     objects = PostQuerySet.as_manager()
     published = PublishedPostManager()
 
+    def get_image_srcset(self, extension: str) -> str:
+        sizes = self.image_renditions.get('formats', {}).get(extension, {})
+        return ', '.join(
+            f'{self.image.storage.url(name)} {width}w'
+            for width, name in sizes.items()
+        )
+
+    @property
+    def image_webp_srcset(self) -> str:
+        return self.get_image_srcset('webp')
+
+    @property
+    def image_jpeg_srcset(self) -> str:
+        return self.get_image_srcset('jpeg')
+
     @property
     def is_visible(self):
-        return (self.pub_date <= timezone.now()
+        return ((self.is_live or self.pub_date <= timezone.now())
                 and self.category.is_published
                 and self.is_published)
 
@@ -84,11 +143,126 @@ class Post(PublicationBase):
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
         default_related_name = 'posts'
+        indexes = (
+            # Главная лента: опубликованные посты по убыванию pub_date.
+            models.Index(
+                fields=('-pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=('is_published', '-pub_date'),
+                name='post_is_published_date_idx',
+            ),
+            # Отложенные посты: run_jobs ищет наступившие при каждом опросе.
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_live=False),
+                name='post_scheduled_idx',
+            ),
+            # Лента категории.
+            models.Index(
+                fields=('category', 'is_published', '-pub_date'),
+                name='post_category_feed_idx',
+            ),
+            # Лента профиля автора.
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_feed_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return self.title
 
 
+class FeedEntry(models.Model):
+    """
+    Запись ленты: копия полей поста, по которым лента фильтруется и
+    сортируется. Поддерживается сигналами (см. blog/feed.py), чтобы
+    страница ленты выбиралась из одной таблицы по индексу.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='feed_entry',
+        verbose_name='Публикация',
+    )
+    category = models.ForeignKey(
+        'Category',
+        on_delete=models.SET_NULL,
+        null=True,
+        db_index=False,
+        related_name='+',
+        verbose_name='Категория',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='+',
+        verbose_name='Автор публикации',
+    )
+    pub_date = models.DateTimeField('Дата и время публикации')
+    # Пост и категория опубликованы. В ленте запись появляется, когда
+    # наступает pub_date (см. FeedEntryQuerySet.visible).
+    is_visible = models.BooleanField('Виден в ленте', default=False)
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0
+    )
+    objects = FeedEntryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date',),
+                condition=models.Q(is_visible=True),
+                name='feed_visible_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                condition=models.Q(is_visible=True),
+                name='feed_category_idx',
+            ),
+            # Профиль: для владельца выводятся и скрытые посты, поэтому
+            # индекс не частичный.
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='feed_author_idx',
+            ),
+        )
+
+    def __str__(self) -> str:
+        return str(self.post_id)
+
+
+class SearchDocument(models.Model):
+    """
+    Запись поискового индекса поста. Таблица создается миграцией под
+    конкретную СУБД (см. blog/search.py), модель нужна только для
+    соединения с постами в запросах.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_document',
+    )
+    # Есть только в PostgreSQL.
+    document = SearchVectorField(null=True)
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_search'
+
+
 class Category(PublicationBase):
     title = models.CharField('Заголовок', max_length=MAX_LENGTH_STRING)
     description = models.TextField('Описание')
@@ -118,7 +292,7 @@ class Location(PublicationBase):
         return self.name
 
 
-class Comment(CreationBase):
+class Comment(RenderedTextMixin, CreationBase):
     text = models.TextField('Текст комментария')
     author = models.ForeignKey(
         User,
@@ -136,6 +310,96 @@ class Comment(CreationBase):
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return get_short_text(self.text, max_symbols=COMMENT_DISPLAY_LENGTH)
+
+
+class RenderedText(models.Model):
+    """
+    Готовый HTML поля text и версия рендерера, которой он получен.
+    Хранится в отдельной таблице, чтобы списки и выборки без вывода
+    текста его не загружали (см. blog/rendering.py).
+    """
+
+    html = models.TextField('HTML', blank=True)
+    version = models.PositiveSmallIntegerField('Версия рендерера',
+                                               default=0)
+
+    class Meta:
+        abstract = True
+
+
+class PostHTML(RenderedText):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rendered',
+        verbose_name='Публикация',
+    )
+
+    class Meta:
+        verbose_name = 'HTML публикации'
+        verbose_name_plural = 'HTML публикаций'
+
+
+class CommentHTML(RenderedText):
+    comment = models.OneToOneField(
+        Comment,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rendered',
+        verbose_name='Комментарий',
+    )
+
+    class Meta:
+        verbose_name = 'HTML комментария'
+        verbose_name_plural = 'HTML комментариев'
+
+
+class Job(models.Model):
+    """Отложенная задача фоновой очереди (см. blog/jobs.py)."""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=MAX_LENGTH_STRING)
+    args = models.JSONField('Аргументы', default=list, blank=True)
+    status = models.CharField(
+        'Статус', max_length=16, choices=STATUSES, default=PENDING
+    )
+    run_at = models.DateTimeField('Выполнить не раньше', default=timezone.now)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток', default=3
+    )
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('run_at',)
+        indexes = (
+            models.Index(fields=('status', 'run_at'),
+                         name='job_status_run_at_idx'),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.name} ({self.get_status_display()})'
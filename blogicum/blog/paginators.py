@@ -0,0 +1,192 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.http import Http404
+from django.utils.functional import cached_property
+
+
+class CursorPage:
+    """Страница, полученная по курсору."""
+
+    def __init__(self, object_list: List, paginator: 'CursorPaginator',
+                 has_next: bool, has_previous: bool):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if not (self._has_next and self.object_list):
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        if not (self._has_previous and self.object_list):
+            return None
+        return self.paginator.encode_cursor(self.object_list[0],
+                                            reverse=True)
+
+    @property
+    def last_cursor(self) -> str:
+        return self.paginator.last_cursor
+
+
+class CursorPaginator:
+    """
+    Пагинация по ключу (order_field, id) без COUNT и OFFSET. order_field —
+    поле или аннотация с датой либо числом.
+    Курсор — непрозрачная строка с позицией крайнего объекта страницы и
+    направлением перехода, поэтому время получения любой страницы
+    не зависит от ее «глубины».
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int,
+                 order_field: str = 'pub_date', descending: bool = True):
+        self.order_field = order_field
+        self.descending = descending
+        self.queryset = queryset.order_by(*self.get_ordering(descending))
+        self.per_page = per_page
+
+    def get_ordering(self, descending: bool) -> tuple:
+        prefix = '-' if descending else ''
+        return f'{prefix}{self.order_field}', f'{prefix}pk'
+
+    def get_filter(self, position: dict, descending: bool) -> Q:
+        """Объекты, идущие после position в заданном порядке."""
+        lookup = 'lt' if descending else 'gt'
+        return (
+            Q(**{f'{self.order_field}__{lookup}': position['d']})
+            | Q(**{self.order_field: position['d'],
+                   f'pk__{lookup}': position['i']})
+        )
+
+    def encode_cursor(self, obj=None, reverse: bool = False) -> str:
+        position = {'r': reverse}
+        if obj is not None:
+            value = getattr(obj, self.order_field)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            position.update(d=value, i=obj.pk)
+        return base64.urlsafe_b64encode(
+            json.dumps(position).encode()
+        ).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> dict:
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if 'd' in position:
+                # Даты хранятся строкой, числа (например, релевантность
+                # в поиске) — как есть.
+                if isinstance(position['d'], str):
+                    position['d'] = datetime.fromisoformat(position['d'])
+                elif not isinstance(position['d'], (int, float)):
+                    raise TypeError
+                position['i'] = int(position['i'])
+            position['r'] = bool(position['r'])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise Http404('Некорректный курсор страницы.')
+        return position
+
+    @property
+    def last_cursor(self) -> str:
+        return self.encode_cursor(reverse=True)
+
+    def get_page_queryset(
+            self, cursor: Optional[str]) -> Tuple[QuerySet, dict]:
+        """
+        Запрос страницы на per_page + 1 объектов: лишний объект показывает,
+        есть ли страницы дальше в направлении перехода.
+        """
+        if not cursor:
+            return self.queryset[:self.per_page + 1], {'r': False}
+
+        position = self.decode_cursor(cursor)
+        if position['r']:
+            queryset = self.queryset
+            if 'd' in position:
+                queryset = queryset.filter(
+                    self.get_filter(position, not self.descending)
+                )
+            queryset = queryset.order_by(
+                *self.get_ordering(not self.descending)
+            )
+        elif 'd' in position:
+            queryset = self.queryset.filter(
+                self.get_filter(position, self.descending)
+            )
+        else:
+            raise Http404('Некорректный курсор страницы.')
+        return queryset[:self.per_page + 1], position
+
+    def make_page(self, objects: List, position: dict) -> CursorPage:
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if position['r']:
+            return CursorPage(objects[::-1], self,
+                              has_next='d' in position,
+                              has_previous=has_more)
+        return CursorPage(objects, self, has_next=has_more,
+                          has_previous='d' in position)
+
+    def page(self, cursor: Optional[str] = None) -> CursorPage:
+        queryset, position = self.get_page_queryset(cursor)
+        return self.make_page(list(queryset), position)
+
+    async def apage(self, cursor: Optional[str] = None) -> CursorPage:
+        queryset, position = self.get_page_queryset(cursor)
+        return self.make_page([obj async for obj in queryset], position)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор списков админки. Для нефильтрованного списка в PostgreSQL
+    число строк берется из статистики планировщика (pg_class.reltuples)
+    вместо COUNT(*) по всей таблице. Отфильтрованные списки, небольшие
+    таблицы и SQLite считаются точно.
+    """
+
+    # Меньше этого числа строк COUNT(*) дешев и считается точно.
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class '
+                    'WHERE oid = %s::regclass',
+                    (queryset.model._meta.db_table,),
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.estimate_threshold:
+                return row[0]
+        return super().count
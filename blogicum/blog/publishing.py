@@ -0,0 +1,33 @@
+"""Планировщик отложенных публикаций."""
+from datetime import datetime
+from typing import List, Optional
+
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from blog.models import Post
+
+# Отправляется с sender=Post и post_ids — списком опубликованных постов.
+post_published = Signal()
+
+
+def publish_due_posts(now: Optional[datetime] = None) -> List[int]:
+    """Публикует отложенные посты, время которых наступило."""
+    with transaction.atomic():
+        post_ids = list(Post.objects
+                        .select_for_update()
+                        .due(now)
+                        .values_list('pk', flat=True))
+        Post.objects.filter(pk__in=post_ids).update(is_live=True)
+    if post_ids:
+        post_published.send(sender=Post, post_ids=post_ids)
+    return post_ids
+
+
+def get_next_publication() -> Optional[datetime]:
+    return (Post.objects
+            .filter(is_live=False, pub_date__gt=timezone.now())
+            .order_by('pub_date')
+            .values_list('pub_date', flat=True)
+            .first())
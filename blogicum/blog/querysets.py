@@ -1,26 +1,74 @@
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
-from django.db.models import Count
 
+# Поля, которые выводит карточка поста (includes/post_card.html).
+FEED_FIELDS = (
+    'title',
+    'excerpt',
+    'pub_date',
+    'image',
+    'image_renditions',
+    'is_published',
+    'updated_at',
+    'comment_count',
+    'author',
+    'author__username',
+    'location',
+    'location__name',
+    'location__is_published',
+    'category',
+    'category__title',
+    'category__slug',
+    'category__is_published',
+)
 
-class CommentCountMixin:
-    def comment_count(self):
-        return (self.annotate(comment_count=Count('comments'))
-                    .order_by('-pub_date'))
 
-
-class PostQuerySet(models.QuerySet, CommentCountMixin):
+class PostQuerySet(models.QuerySet):
     def with_union_data(self) -> 'PostQuerySet':
         return self.select_related('category')
 
+    def with_feed_data(self) -> 'PostQuerySet':
+        """
+        Загружает одним запросом все связанные объекты карточки поста,
+        ограничиваясь полями, которые выводятся в ленте.
+        """
+        return (self.select_related('author', 'location', 'category')
+                    .only(*FEED_FIELDS))
+
+    def newest_first(self) -> 'PostQuerySet':
+        return self.order_by('-pub_date')
+
     def is_published(self) -> 'PostQuerySet':
-        return self.filter(is_published=True,
-                           pub_date__lt=timezone.now(),
+        # Сравнение с датой — на случай, если обработчик очереди не запущен
+        # и отложенный пост еще не отмечен планировщиком.
+        return self.filter(Q(is_live=True) | Q(pub_date__lte=timezone.now()),
+                           is_published=True,
                            category__is_published=True)
 
+    def due(self, now=None) -> 'PostQuerySet':
+        """Отложенные посты, дата публикации которых уже наступила."""
+        return self.filter(is_live=False,
+                           pub_date__lte=now or timezone.now())
+
 
-class PublishedPostManager(models.Manager, CommentCountMixin):
+class PublishedPostManager(models.Manager.from_queryset(PostQuerySet)):
     def get_queryset(self) -> PostQuerySet:
-        return (PostQuerySet(self.model)
+        return (super().get_queryset()
                 .with_union_data()
                 .is_published())
+
+
+class FeedEntryQuerySet(models.QuerySet):
+    def visible(self) -> 'FeedEntryQuerySet':
+        return self.filter(is_visible=True, pub_date__lte=timezone.now())
+
+    def with_posts(self) -> 'FeedEntryQuerySet':
+        """
+        Посты записей со связанными объектами карточки. Соединения идут по
+        первичному ключу и только для строк страницы.
+        """
+        return (self.select_related('post__author', 'post__location',
+                                    'post__category')
+                    .only('pub_date', 'post',
+                          *(f'post__{field}' for field in FEED_FIELDS)))
@@ -0,0 +1,95 @@
+"""Готовый HTML текстов постов и комментариев."""
+from typing import Iterable, Optional
+
+from django.template.defaultfilters import linebreaksbr
+
+# Увеличьте при любом изменении render_text.
+RENDERER_VERSION = 1
+
+
+def render_text(text: str) -> str:
+    """Экранирует текст и заменяет переводы строк на <br>."""
+    return str(linebreaksbr(text, autoescape=True))
+
+
+def get_html_model(model):
+    """Модель готового HTML для Post или Comment."""
+    return model._meta.get_field('rendered').related_model
+
+
+def save_rendered(model, objects: Iterable, batch_size: int = 1000,
+                  using: str = 'default') -> int:
+    """Создает или обновляет HTML текстов objects одним запросом на пачку."""
+    html_model = get_html_model(model)
+    field = model._meta.get_field('rendered').field.name
+    rows = [
+        html_model(**{f'{field}_id': obj.pk},
+                   html=render_text(obj.text), version=RENDERER_VERSION)
+        for obj in objects
+    ]
+    html_model.objects.using(using).bulk_create(
+        rows, batch_size=batch_size, update_conflicts=True,
+        unique_fields=(field,),
+        update_fields=('html', 'version'),
+    )
+    return len(rows)
+
+
+def _unrendered_texts(objects):
+    """
+    Объекты без готового HTML (связь rendered выбрана через
+    select_related) и запрос их текстов.
+    """
+    missing = {obj.pk: obj for obj in objects if not hasattr(obj, 'rendered')}
+    if not missing:
+        return missing, None
+    obj = next(iter(missing.values()))
+    texts = (type(obj)._base_manager.using(obj._state.db)
+             .filter(pk__in=missing).values_list('pk', 'text'))
+    return missing, texts
+
+
+def load_unrendered_texts(objects) -> None:
+    """
+    Загружает одним запросом отложенный text объектов, HTML которых еще не
+    отрисован, чтобы text_as_html не обращался к БД для каждого из них.
+    """
+    missing, texts = _unrendered_texts(objects)
+    if texts is not None:
+        for pk, text in texts:
+            missing[pk].text = text
+
+
+async def aload_unrendered_texts(objects) -> None:
+    """Асинхронный аналог load_unrendered_texts."""
+    missing, texts = _unrendered_texts(objects)
+    if texts is not None:
+        async for pk, text in texts:
+            missing[pk].text = text
+
+
+def get_stale(model, using: str = 'default'):
+    """Объекты model без HTML или с HTML устаревшей версии."""
+    return (model.objects.using(using)
+            .exclude(rendered__version=RENDERER_VERSION))
+
+
+def render_stale(model, last_pk: int = 0, batch_size: int = 500,
+                 using: str = 'default') -> Optional[int]:
+    """
+    Перерисовывает следующие за last_pk устаревшие объекты model, не больше
+    batch_size. Возвращает id последнего из них или None, если таких
+    объектов не осталось.
+    """
+    batch = list(get_stale(model, using)
+                 .filter(pk__gt=last_pk)
+                 .order_by('pk')
+                 .only('pk', 'text')[:batch_size])
+    if not batch:
+        return None
+    save_rendered(model, batch, using=using)
+    return batch[-1].pk
+
+
+def has_stale(model, using: str = 'default') -> bool:
+    return get_stale(model, using).exists()
@@ -0,0 +1,63 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+
+PRIMARY_DB = 'default'
+
+primary_flag: ContextVar[bool] = ContextVar('blogprimary_flag', default=False)
+# Реплика, выбранная для текущего запроса: все его чтения видят один
+# снимок данных.
+request_replica: ContextVar[Optional[str]] = ContextVar(
+    'blog_request_replica', default=None
+)
+
+# Приложения, чтение из которых всегда идет с основной БД: сессия,
+# записанная при входе, должна быть видна уже в следующем запросе.
+PRIMARY_ONLY_APPS = ('sessions',)
+
+
+@contextmanager
+def use_primary():
+    """Направляет все запросы на чтение внутри блока в основную БД."""
+    token = primary_flag.set(True)
+    try:
+        yield
+    finally:
+        primary_flag.reset(token)
+
+
+def is_primary_forced() -> bool:
+    return primary_flag.get()
+
+
+def choose_replica() -> Optional[str]:
+    """Случайная реплика для нового запроса или None без реплик."""
+    replicas = settings.BLOG_DB_REPLICAS
+    return random.choice(replicas) if replicas else None
+
+
+class PrimaryReplicaRouter:
+    """
+    Запись всегда идет в основную БД, чтение — в одну из реплик из
+    BLOG_DB_REPLICAS, если только запрос не помечен use_primary().
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.BLOG_DB_REPLICAS
+        if (not replicas
+                or primary_flag.get()
+                or model._meta.app_label in PRIMARY_ONLY_APPS):
+            return PRIMARY_DB
+        return request_replica.get() or random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_DB
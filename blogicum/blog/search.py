@@ -0,0 +1,179 @@
+"""Полнотекстовый поиск: FTS5 в SQLite, tsvector в PostgreSQL."""
+import re
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+import snowballstemmer
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.models import BooleanField, F, FloatField, QuerySet, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'blog_post_search'
+# Во сколько раз совпадение в заголовке весомее совпадения в тексте.
+TITLE_WEIGHT = 10.0
+
+WORD_RE = re.compile(r'\w+')
+
+Row = Tuple[int, str, str]
+
+
+@lru_cache(maxsize=None)
+def get_stemmer():
+    return snowballstemmer.stemmer('russian')
+
+
+# Стеммер на чистом Python медленный, а словарь текстов постов невелик,
+# поэтому основы слов запоминаются.
+@lru_cache(maxsize=100000)
+def stem(word: str) -> str:
+    return get_stemmer().stemWord(word)
+
+
+def stem_words(text: str) -> List[str]:
+    return [stem(word)
+            for word in WORD_RE.findall(text.lower().replace('ё', 'е'))]
+
+
+class SQLiteSearchBackend:
+    create_sql = (
+        f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+        f"title, text, tokenize = 'unicode61 remove_diacritics 0')",
+    )
+    drop_sql = (f'DROP TABLE IF EXISTS {SEARCH_TABLE}',)
+
+    @staticmethod
+    def to_document(text: str) -> str:
+        return ' '.join(stem_words(text))
+
+    def insert(self, cursor, rows: List[Row]) -> None:
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+            f'VALUES (%s, %s, %s)',
+            [(pk, self.to_document(title), self.to_document(text))
+             for pk, title, text in rows],
+        )
+
+    def delete(self, cursor, post_ids: List[int]) -> None:
+        cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+                           [(pk,) for pk in post_ids])
+
+    def clear(self, cursor) -> None:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        words = stem_words(query)
+        # Слова в кавычках, чтобы ввод пользователя не разбирался как
+        # синтаксис запросов FTS5; пробел между ними означает AND.
+        match = ' '.join(f'"{word}"' for word in words)
+        return (
+            queryset
+            .filter(search_document__isnull=False)
+            .filter(RawSQL(f'"{SEARCH_TABLE}" MATCH %s', (match,),
+                           output_field=BooleanField()))
+            # bm25 тем меньше, чем лучше совпадение.
+            .annotate(rank=RawSQL(f'-bm25("{SEARCH_TABLE}", %s, 1.0)',
+                                  (TITLE_WEIGHT,),
+                                  output_field=FloatField()))
+        )
+
+
+class PostgreSQLSearchBackend:
+    config = 'russian'
+    create_sql = (
+        f'CREATE TABLE {SEARCH_TABLE} ('
+        f'rowid bigint PRIMARY KEY REFERENCES blog_post (id) '
+        f'ON DELETE CASCADE, '
+        f'document tsvector NOT NULL)',
+        f'CREATE INDEX {SEARCH_TABLE}_document_idx '
+        f'ON {SEARCH_TABLE} USING GIN (document)',
+    )
+    drop_sql = (f'DROP TABLE IF EXISTS {SEARCH_TABLE}',)
+
+    def insert(self, cursor, rows: List[Row]) -> None:
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, document) VALUES ('
+            f"%s, setweight(to_tsvector('{self.config}', %s), 'A') "
+            f"|| setweight(to_tsvector('{self.config}', %s), 'B')) "
+            f'ON CONFLICT (rowid) DO UPDATE SET document = EXCLUDED.document',
+            rows,
+        )
+
+    def delete(self, cursor, post_ids: List[int]) -> None:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = ANY(%s)',
+                       (list(post_ids),))
+
+    def clear(self, cursor) -> None:
+        cursor.execute(f'TRUNCATE {SEARCH_TABLE}')
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        search_query = SearchQuery(query, config=self.config,
+                                   search_type='websearch')
+        return (
+            queryset
+            .filter(search_document__document=search_query)
+            .annotate(rank=SearchRank(F('search_document__document'),
+                                      search_query))
+        )
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def get_backend(connection):
+    try:
+        return BACKENDS[connection.vendor]()
+    except KeyError:
+        raise ImproperlyConfigured(
+            f'Полнотекстовый поиск не поддерживается для '
+            f'{connection.vendor}.'
+        )
+
+
+def index_posts(posts: Iterable, using: str = 'default') -> None:
+    """Добавляет посты в индекс или обновляет их записи."""
+    rows = [(post.pk, post.title, post.text) for post in posts]
+    connection = connections[using]
+    backend = get_backend(connection)
+    with connection.cursor() as cursor:
+        backend.delete(cursor, [pk for pk, _, _ in rows])
+        backend.insert(cursor, rows)
+
+
+def unindex_posts(post_ids: List[int], using: str = 'default') -> None:
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        get_backend(connection).delete(cursor, post_ids)
+
+
+def rebuild_index(post_model, connection, batch_size: int = 5000) -> int:
+    """Заново индексирует все посты post_model пачками по batch_size."""
+    backend = get_backend(connection)
+    posts = post_model.objects.using(connection.alias).order_by('pk')
+    last_pk = 0
+    indexed = 0
+    with connection.cursor() as cursor:
+        backend.clear(cursor)
+        while True:
+            rows = list(posts.filter(pk__gt=last_pk)
+                        .values_list('pk', 'title', 'text')[:batch_size])
+            if not rows:
+                break
+            backend.insert(cursor, rows)
+            indexed += len(rows)
+            last_pk = rows[-1][0]
+    return indexed
+
+
+def search_posts(queryset: QuerySet, query: str) -> QuerySet:
+    """
+    Посты из queryset, подходящие под запрос, с релевантностью в
+    аннотации rank (больше — лучше).
+    """
+    if not WORD_RE.search(query):
+        return queryset.annotate(rank=Value(0.0)).none()
+    return get_backend(connections[queryset.db]).search(queryset, query)
@@ -0,0 +1,205 @@
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_migrate, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog.cache import bump_feed_version, schedule_feed_change
+from blog.feed import (change_entry_comment_count, sync_category_entries,
+                       sync_post_entries)
+from blog.images import get_rendition_names
+from blog.jobs import enqueue, enqueue_once
+from blog.models import Category, Comment, FeedEntry, Location, Post
+from blog.publishing import post_published
+from blog.rendering import get_html_model, has_stale, save_rendered
+from blog.search import index_posts, unindex_posts
+from blog.tasks import (delete_files, process_post_image, publish_posts,
+                        render_texts)
+from blog.utils import make_excerpt
+
+User = get_user_model()
+
+
+def change_comment_count(post_id: int, delta: int) -> None:
+    """Атомарно изменяет счетчик комментариев поста на delta."""
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta
+    )
+    change_entry_comment_count(post_id, delta)
+
+
+@receiver(pre_save, sender=Comment)
+def move_comment(sender, instance, **kwargs):
+    """
+    Переносит комментарий в счетчике другого поста, если комментарий
+    перепривязали (например, через админку).
+    """
+    if instance.pk is None:
+        return
+    old_post_id = (Comment.objects
+                   .filter(pk=instance.pk)
+                   .values_list('post_id', flat=True)
+                   .first())
+    if old_post_id is not None and old_post_id != instance.post_id:
+        change_comment_count(old_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    if created:
+        change_comment_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    change_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_feed_pages(sender, **kwargs):
+    bump_feed_version()
+
+
+@receiver(post_published)
+def invalidate_feed_pages_on_publication(sender, **kwargs):
+    # Посты публикуются через update(), post_save не отправляется.
+    bump_feed_version()
+
+
+@receiver(post_save, sender=User)
+def invalidate_feed_pages_on_user_change(sender, update_fields=None,
+                                         **kwargs):
+    # Вход пользователя обновляет только last_login и на ленту не влияет.
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        bump_feed_version()
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_image(sender, instance, raw=False, **kwargs):
+    instance.old_image_name = ''
+    if instance.pk is not None and not raw:
+        instance.old_image_name = (Post.objects
+                                   .filter(pk=instance.pk)
+                                   .values_list('image', flat=True)
+                                   .first()) or ''
+
+
+@receiver(post_save, sender=Post)
+def handle_post_image(sender, instance, **kwargs):
+    """
+    Ставит в фоновую очередь удаление замененного файла и обработку
+    нового изображения (вместо django_cleanup, который удаляет в запросе).
+    """
+    old_image_name = getattr(instance, 'old_image_name', '')
+    if old_image_name and old_image_name != instance.image.name:
+        enqueue(delete_files, [old_image_name])
+
+    renditions = instance.image_renditions
+    if not instance.image:
+        if renditions:
+            enqueue(delete_files, get_rendition_names(renditions))
+            Post.objects.filter(pk=instance.pk).update(image_renditions={})
+    elif renditions.get('source') != instance.image.name:
+        enqueue(process_post_image, instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_image(sender, instance, **kwargs):
+    names = get_rendition_names(instance.image_renditions)
+    if instance.image:
+        names.append(instance.image.name)
+    if names:
+        enqueue(delete_files, names)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, using, update_fields=None,
+                        **kwargs):
+    if update_fields is None or {'title', 'text'} & set(update_fields):
+        index_posts([instance], using=using)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, using, **kwargs):
+    unindex_posts([instance.pk], using=using)
+
+
+@receiver(pre_save, sender=Post)
+def set_post_live(sender, instance, **kwargs):
+    instance.is_live = instance.pub_date <= timezone.now()
+
+
+@receiver(pre_save, sender=Post)
+def set_post_excerpt(sender, instance, update_fields=None, **kwargs):
+    # При сохранении отдельных полей текст может быть не загружен.
+    if update_fields is None or 'text' in update_fields:
+        instance.excerpt = make_excerpt(instance.text)
+
+
+@receiver(post_save, sender=Post)
+def save_post_excerpt(sender, instance, using, update_fields=None,
+                      **kwargs):
+    # save(update_fields=['text']) не записывает пересчитанный анонс.
+    if (update_fields is not None and 'text' in update_fields
+            and 'excerpt' not in update_fields):
+        Post.objects.using(using).filter(pk=instance.pk).update(
+            excerpt=instance.excerpt
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def update_text_html(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'text' in update_fields:
+        save_rendered(sender, [instance])
+
+
+@receiver(post_migrate)
+def schedule_text_rendering(sender, using, **kwargs):
+    """После смены RENDERER_VERSION перерисовывает тексты в фоне."""
+    if sender.name != 'blog':
+        return
+    # При откате до миграции 0016 таблиц HTML еще нет.
+    tables = connections[using].introspection.table_names()
+    for model in (Post, Comment):
+        if (get_html_model(model)._meta.db_table in tables
+                and has_stale(model, using)):
+            enqueue(render_texts, model._meta.label)
+
+
+@receiver(post_save, sender=Post)
+def schedule_publication(sender, instance, **kwargs):
+    if not instance.is_live:
+        enqueue_once(publish_posts, run_at=instance.pub_date)
+        schedule_feed_change(instance.pub_date)
+
+
+@receiver(post_save, sender=Post)
+def update_feed_entry(sender, instance, **kwargs):
+    sync_post_entries([instance.pk])
+
+
+@receiver(post_published)
+def show_published_entries(sender, post_ids, **kwargs):
+    sync_post_entries(post_ids)
+
+
+@receiver(post_save, sender=Category)
+def update_category_entries(sender, instance, **kwargs):
+    sync_category_entries(instance)
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_entries(sender, instance, **kwargs):
+    # Посты удаляемой категории остаются без категории и не видны в ленте.
+    FeedEntry.objects.filter(category=instance).update(is_visible=False)
@@ -0,0 +1,57 @@
+"""Отдача сжатой статики с хэшем в имени без отдельного веб-сервера."""
+import gzip
+from pathlib import Path
+from typing import Dict
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # Без пакета Brotli создаются только копии .gz.
+    brotli = None
+
+# Кодировки в порядке предпочтения и расширения их копий.
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.map', '.svg', '.txt', '.json',
+                           '.xml', '.html', '.ico')
+# Выигрыш от сжатия файлов меньше этого размера съедают заголовки.
+MIN_COMPRESS_SIZE = 256
+
+
+def compress(content: bytes) -> Dict[str, bytes]:
+    """Сжатые варианты content, которые меньше исходного."""
+    variants = {'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(content, quality=11)
+    return {encoding: data for encoding, data in variants.items()
+            if len(data) < len(content)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage, который после collectstatic сжимает
+    текстовые файлы. Пока collectstatic не запускался и manifest нет,
+    {% static %} выводит исходные имена, как StaticFilesStorage.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in {*paths, *self.hashed_files.values()}:
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress_file(name)
+
+    def compress_file(self, name: str) -> None:
+        path = Path(self.path(name))
+        content = path.read_bytes()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+        for encoding, data in compress(content).items():
+            suffix = ENCODING_SUFFIXES[encoding]
+            path.with_name(path.name + suffix).write_bytes(data)
@@ -0,0 +1,59 @@
+import base64
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from blog import images, publishing, rendering
+from blog.cache import bump_feed_version
+from blog.constants import RENDER_BATCH_SIZE
+from blog.jobs import enqueue, job
+
+
+@job
+def send_email(message: dict) -> None:
+    """Отправляет письмо через настоящий бэкенд BLOG_EMAIL_BACKEND."""
+    message = dict(message)
+    # Задачи, поставленные до появления вложений, этих ключей не содержат.
+    attachments = message.pop('attachments', ())
+    content_subtype = message.pop('content_subtype', 'plain')
+    email = EmailMultiAlternatives(
+        connection=get_connection(settings.BLOG_EMAIL_BACKEND),
+        **message,
+    )
+    email.content_subtype = content_subtype
+    for filename, content, mimetype in attachments:
+        email.attach(filename, base64.b64decode(content), mimetype)
+    email.send()
+
+
+@job
+def process_post_image(post_id: int) -> None:
+    images.process_post_image(post_id)
+
+
+@job
+def delete_files(names: list) -> None:
+    for name in names:
+        default_storage.delete(name)
+
+
+@job
+def publish_posts() -> None:
+    publishing.publish_due_posts()
+
+
+@job
+def render_texts(model_label: str, last_pk: int = 0) -> None:
+    """
+    Перерисовывает пачку текстов устаревшей версии и ставит в очередь
+    следующую, чтобы одна задача не занимала обработчик надолго. После
+    последней пачки сбрасывает кэш страниц: bulk_create сигналов не шлет.
+    """
+    last_pk = rendering.render_stale(apps.get_model(model_label), last_pk,
+                                     RENDER_BATCH_SIZE)
+    if last_pk is None:
+        bump_feed_version()
+    else:
+        enqueue(render_texts, model_label, last_pk)
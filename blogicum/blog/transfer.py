@@ -0,0 +1,190 @@
+"""Потоковые экспорт и импорт контента блога в формате JSON Lines."""
+import json
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, List, TextIO
+
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.db.models import Model
+
+from blog.cache import bump_feed_version
+from blog.feed import sync_entry_visibility, sync_feed_entries
+from blog.models import Category, Comment, FeedEntry, Location, Post
+from blog.rendering import save_rendered
+from blog.search import index_posts
+from blog.utils import make_excerpt
+
+User = get_user_model()
+
+# Порядок выгрузки: сначала объекты, на которые ссылаются остальные.
+MODELS = (Category, Location, Post, Comment)
+MODELS_BY_LABEL = {model._meta.label_lower: model for model in MODELS}
+
+
+class ExportJSONEncoder(DjangoJSONEncoder):
+    """В отличие от DjangoJSONEncoder, не отбрасывает микросекунды."""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def export_objects(stream: TextIO, batch_size: int = 5000,
+                   using: str = 'default') -> Counter:
+    counts = Counter()
+    for model in MODELS:
+        queryset = model.objects.using(using).order_by('pk')
+        if model is Post or model is Comment:
+            queryset = queryset.select_related('author')
+        serializers.serialize(
+            'jsonl', queryset.iterator(chunk_size=batch_size),
+            stream=stream, use_natural_foreign_keys=True,
+            cls=ExportJSONEncoder,
+        )
+        counts[model._meta.label_lower] = queryset.count()
+    return counts
+
+
+@contextmanager
+def keep_timestamps(model):
+    """
+    Отключает auto_now и auto_now_add, чтобы bulk_create сохранил даты
+    из выгрузки, а не текущее время.
+    """
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now', False)
+              or getattr(field, 'auto_now_add', False)]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class BatchImporter:
+    """Собирает объекты одной модели и сохраняет их пачками."""
+
+    def __init__(self, model, batch_size: int, using: str,
+                 create_users: bool):
+        self.model = model
+        self.batch_size = batch_size
+        self.using = using
+        self.create_users = create_users
+        self.rows: List[dict] = []
+        self.saved = 0
+
+    def add(self, row: dict) -> None:
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def resolve_users(self) -> Dict[str, int]:
+        """Пользователи, на которых пачка ссылается: {username: id}."""
+        usernames = {
+            row['fields']['author'][0] for row in self.rows
+            if isinstance(row['fields'].get('author'), list)
+        }
+        users = dict(User.objects.using(self.using)
+                     .filter(username__in=usernames)
+                     .values_list('username', 'pk'))
+        missing = usernames - users.keys()
+        if missing and self.create_users:
+            new_users = [User(username=username) for username in missing]
+            for user in new_users:
+                user.set_unusable_password()
+            User.objects.using(self.using).bulk_create(new_users)
+            users.update(User.objects.using(self.using)
+                         .filter(username__in=missing)
+                         .values_list('username', 'pk'))
+        elif missing:
+            raise ValueError(
+                f'Нет пользователей: {", ".join(sorted(missing))}.'
+            )
+        return users
+
+    def build(self, row: dict, users: Dict[str, int]) -> Model:
+        values = {self.model._meta.pk.attname: row['pk']}
+        for name, value in row['fields'].items():
+            field = self.model._meta.get_field(name)
+            if field.is_relation:
+                if isinstance(value, list):
+                    value = users[value[0]]
+                values[field.attname] = value
+            else:
+                values[field.attname] = field.to_python(value)
+        return self.model(**values)
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        users = self.resolve_users()
+        objects = [self.build(row, users) for row in self.rows]
+        if self.model is Post:
+            # В выгрузках, сделанных до появления анонсов, их нет.
+            for post in objects:
+                if not post.excerpt:
+                    post.excerpt = make_excerpt(post.text)
+        with keep_timestamps(self.model):
+            self.model.objects.using(self.using).bulk_create(objects)
+        if self.model is Post:
+            # bulk_create не отправляет сигналы, поэтому записи ленты и
+            # поисковый индекс заполняются здесь.
+            sync_feed_entries(Post.objects.using(self.using)
+                              .filter(pk__in=[obj.pk for obj in objects]))
+            index_posts(objects, using=self.using)
+        if self.model is Post or self.model is Comment:
+            # Как и записи ленты, HTML текстов заполняется вместо сигнала.
+            save_rendered(self.model, objects, using=self.using)
+        self.saved += len(objects)
+        self.rows = []
+
+
+def import_objects(lines: Iterable[str], batch_size: int = 5000,
+                   using: str = 'default',
+                   create_users: bool = True) -> Counter:
+    connection = connections[using]
+    importers = {
+        label: BatchImporter(model, batch_size, using, create_users)
+        for label, model in MODELS_BY_LABEL.items()
+    }
+    with transaction.atomic(using=using):
+        with connection.constraint_checks_disabled():
+            for number, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                try:
+                    importer = importers[row['model']]
+                except KeyError:
+                    raise ValueError(
+                        f'Строка {number}: неизвестная модель '
+                        f'{row.get("model")}.'
+                    )
+                importer.add(row)
+            for importer in importers.values():
+                importer.flush()
+            # Пачка постов могла записаться раньше своей категории, тогда
+            # ее записи ленты остались скрытыми.
+            sync_entry_visibility(FeedEntry.objects.using(using))
+        connection.check_constraints(
+            table_names=[model._meta.db_table for model in MODELS]
+        )
+        # После вставки с явными id счетчики первичных ключей (PostgreSQL)
+        # нужно сдвинуть за максимальный id.
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(),
+                                                         MODELS):
+                cursor.execute(sql)
+    # bulk_create и update() не отправляют сигналы.
+    bump_feed_version()
+    return Counter({label: importer.saved
+                    for label, importer in importers.items()})
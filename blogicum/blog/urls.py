@@ -1,14 +1,19 @@
+from django.conf import settings
 from django.urls import path, include
 
-from blog import views
+from blog import async_views, views
 
 app_name = 'blog'
 
+# Страницы только для чтения под ASGI отдаются асинхронными view.
+read_views = async_views if settings.BLOG_ASYNC_VIEWS else views
+
 
 post_endpoints = [
     path('create/', views.PostCreateView.as_view(), name='create_post'),
 
-    path('<int:post_id>/', views.PostDetailView.as_view(), name='post_detail'),
+    path('<int:post_id>/', read_views.PostDetailView.as_view(),
+         name='post_detail'),
 
     path('<int:post_id>/edit/', views.PostUpdateView.as_view(),
          name='edit_post'),
@@ -16,6 +21,9 @@ post_endpoints = [
     path('<int:post_id>/delete/', views.PostDeleteView.as_view(),
          name='delete_post'),
 
+    path('<int:post_id>/comments/', views.PostCommentsView.as_view(),
+         name='post_comments'),
+
     path('<int:post_id>/comment/', views.CommentCreateView.as_view(),
          name='add_comment'),
 
@@ -28,17 +36,19 @@ post_endpoints = [
 
 profile_endpoint = [
     path('edit/', views.ProfileUpdateView.as_view(), name='edit_profile'),
-    path('<slug:username>/', views.ProfileListView.as_view(), name='profile')
+    path('<slug:username>/', read_views.ProfileListView.as_view(),
+         name='profile')
 ]
 
 category_endpoint = [
-    path('<slug:category_slug>/', views.CategoryPostsListView.as_view(),
+    path('<slug:category_slug>/', read_views.CategoryPostsListView.as_view(),
          name='category_posts'),
 ]
 
 
 urlpatterns = [
-    path('', views.IndexListView.as_view(), name='index'),
+    path('', read_views.IndexListView.as_view(), name='index'),
+    path('search/', views.SearchView.as_view(), name='search'),
     path('category/', include(category_endpoint)),
     path('posts/', include(post_endpoints)),
     path('profile/', include(profile_endpoint)),
@@ -1,5 +1,11 @@
+import re
+from itertools import islice
 from typing import Union
 
+from blog.constants import EXCERPT_WORDS
+
+WORD_RE = re.compile(r'\S+')
+
 
 def get_short_text(text: str, max_worlds: int = 10,
                    max_symbols: Union[int, None] = None):
@@ -15,3 +21,34 @@ def get_short_text(text: str, max_worlds: int = 10,
         text_split = text.split()
         return (text if len(text_split) > max_worlds
                 else ' '.join(text_split[:max_worlds]) + '...')
+
+
+def make_excerpt(text: str, max_words: int = EXCERPT_WORDS) -> str:
+    """
+    Анонс поста: первые max_words слов, как у фильтра truncatewords.
+    Читает только начало текста, а не разбивает на слова весь текст.
+    """
+    words = [match.group()
+             for match in islice(WORD_RE.finditer(text), max_words + 1)]
+    if len(words) > max_words:
+        return ' '.join(words[:max_words]) + ' …'
+    return ' '.join(words)
+
+
+def update_excerpts(post_model, batch_size: int = 500,
+                    using: str = 'default') -> int:
+    """Пересчитывает анонсы всех постов post_model пачками по batch_size."""
+    posts = post_model.objects.using(using).order_by('pk')
+    last_pk = 0
+    updated = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)
+                     .only('pk', 'text')[:batch_size])
+        if not batch:
+            break
+        for post in batch:
+            post.excerpt = make_excerpt(post.text)
+        post_model.objects.using(using).bulk_update(batch, ['excerpt'])
+        updated += len(batch)
+        last_pk = batch[-1].pk
+    return updated
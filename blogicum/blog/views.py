@@ -1,33 +1,188 @@
+from functools import partial
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.http import Http404
+from django.core.paginator import InvalidPage
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django.views.generic import (CreateView, DeleteView, ListView,
                                   UpdateView, DetailView)
 
-from blog.constants import OBJECTS_ON_PAGE
+from blog.cache import (can_cache_page, get_page_etag, get_page_key,
+                        is_feed_settled, page_cache, store_page)
+from blog.constants import COMMENTS_ON_PAGE, OBJECTS_ON_PAGE
 from blog.forms import CommentForm, PostForm, ProfileBaseForm
-from blog.models import Category, Comment, Post, User
+from blog.models import Category, Comment, FeedEntry, Post, User
+from blog.paginators import CursorPaginator
+from blog.rendering import load_unrendered_texts
+from blog.search import search_posts
+
+
+# Общие функции синхронных и асинхронных (blog/async_views.py) страниц.
+def get_page_number(paginator, page_number) -> int:
+    try:
+        return (paginator.num_pages if page_number == 'last'
+                else paginator.validate_number(page_number))
+    except InvalidPage:
+        raise Http404('Неверная страница.')
+
+
+def get_page_context(paginator, page, cursor_pagination: bool) -> dict:
+    context = {
+        'paginator': paginator,
+        'page_obj': page,
+        'is_paginated': page.has_other_pages(),
+        'object_list': page.object_list,
+        'cursor_pagination': cursor_pagination,
+    }
+    if not cursor_pagination:
+        context['page_range'] = paginator.get_elided_page_range(
+            page.number, on_each_side=2, on_ends=1
+        )
+    return context
+
+
+def is_visible_to(post, user_pk) -> bool:
+    """Неопубликованный пост виден только автору."""
+    return post.is_visible or post.author_id == user_pk
+
+
+def get_comments_paginator(post) -> CursorPaginator:
+    # Выводится готовый HTML, исходный текст загружается только для еще
+    # не отрисованных комментариев.
+    return CursorPaginator(
+        post.comments.select_related('author', 'rendered').defer('text'),
+        COMMENTS_ON_PAGE,
+        order_field='created_at',
+        descending=False,
+    )
+
+
+def get_comments_context(comments_page) -> dict:
+    return {
+        'form': CommentForm(),
+        'comments': comments_page.object_list,
+        'comments_page': comments_page,
+    }
 
 
 # Mixins.
-class ListViewMixin(ListView):
+class ConditionalGetMixin:
+    """
+    Отдает 304 Not Modified без выполнения view, если страница не
+    менялась с прошлого запроса этого пользователя.
+    """
+
+    @method_decorator(condition(etag_func=get_page_etag))
+    def dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
+
+class AnonymousPageCacheMixin:
+    """
+    Отдает анонимным пользователям закэшированный ответ целиком, как
+    cache_page. Ключ страницы содержит версию ленты, которая меняется при
+    любом изменении постов, комментариев, категорий и местоположений.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not can_cache_page(request, not request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = get_page_key(request)
+        cached = page_cache().get(key)
+        if cached is not None:
+            return cached
+
+        cacheable = is_feed_settled()
+        response = super().dispatch(request, *args, **kwargs)
+        if cacheable:
+            response.add_post_render_callback(partial(store_page, key))
+        return response
+
+
+class ListViewMixin(ConditionalGetMixin, AnonymousPageCacheMixin,
+                    ListView):
     paginate_by = OBJECTS_ON_PAGE
+    cursor_kwarg = 'cursor'
+    cursor_order_field = 'pub_date'
+
+    @property
+    def cursor_pagination(self) -> bool:
+        return settings.BLOG_CURSOR_PAGINATION
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        При включенной настройке BLOG_CURSOR_PAGINATION лента листается
+        по курсору (pub_date, id) вместо номера страницы.
+        """
+        if self.cursor_pagination:
+            paginator = CursorPaginator(queryset, page_size,
+                                        order_field=self.cursor_order_field)
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        else:
+            paginator = self.get_paginator(queryset, page_size)
+            page = paginator.page(get_page_number(
+                paginator,
+                self.kwargs.get(self.page_kwarg)
+                or self.request.GET.get(self.page_kwarg) or 1,
+            ))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(get_page_context(context['paginator'],
+                                        context['page_obj'],
+                                        self.cursor_pagination))
+        return context
+
+
+class FeedListMixin(ListViewMixin):
+    """
+    Лента, страница которой выбирается из таблицы FeedEntry, а в шаблон
+    передаются посты записей.
+    """
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, object_list, is_paginated = (
+            super().paginate_queryset(queryset.with_posts(), page_size)
+        )
+        page.object_list = [entry.post for entry in object_list]
+        return paginator, page, page.object_list, is_paginated
+
+    def get_context_object_name(self, object_list):
+        return 'post_list'
 
 
 class UserAccessMixin(UserPassesTestMixin):
+    _object = None
+
+    def get_object(self, queryset=None):
+        """
+        Запоминает объект на время запроса: он нужен и для проверки прав,
+        и самому UpdateView/DeleteView.
+        """
+        if self._object is None:
+            self._object = super().get_object(queryset)
+        return self._object
+
     def test_func(self):
-        object = self.get_object()
-        return object.author == self.request.user
+        return self.get_object().author_id == self.request.user.pk
 
 
 class PostMixin(LoginRequiredMixin):
     model = Post
+    use_primary_db = True
     template_name = 'blog/create.html'
 
     def get_success_url(self) -> str:
+        # Автором поста всегда является текущий пользователь.
         return reverse('blog:profile',
-                       kwargs={'username': self.object.author.username})
+                       kwargs={'username': self.request.user.username})
 
 
 class PostChangeMixin(UserAccessMixin, PostMixin):
@@ -41,11 +196,12 @@ class PostChangeMixin(UserAccessMixin, PostMixin):
 
 class CommentMixin(LoginRequiredMixin):
     model = Comment
+    use_primary_db = True
     template_name = 'blog/comment.html'
 
     def get_success_url(self):
-        post = self.object.post
-        return reverse('blog:post_detail', kwargs={'post_id': post.pk})
+        return reverse('blog:post_detail',
+                       kwargs={'post_id': self.object.post_id})
 
 
 class CommentChangeMixin(UserAccessMixin, CommentMixin):
@@ -53,27 +209,20 @@ class CommentChangeMixin(UserAccessMixin, CommentMixin):
 
     # Необходимо, чтобы на странице редактирования/удаления комментария,
     # при вводе в адресную строку несуществующего поста выдавало 404.
-    def get_object(self, queryset=None):
-        object = get_object_or_404(
-            Comment,
-            pk=self.kwargs.get(self.pk_url_kwarg),
-            post=self.kwargs.get('post_id'),
-        )
-        return object
+    def get_queryset(self):
+        return Comment.objects.filter(post=self.kwargs.get('post_id'))
 
 
-class IndexListView(ListViewMixin):
+class IndexListView(FeedListMixin):
     """Главная страница."""
 
     template_name = 'blog/index.html'
 
     def get_queryset(self):
-        return (
-            Post.published.comment_count()
-        )
+        return FeedEntry.objects.visible()
 
 
-class CategoryPostsListView(ListViewMixin):
+class CategoryPostsListView(FeedListMixin):
     """Страница категории."""
 
     template_name = 'blog/category.html'
@@ -85,7 +234,7 @@ class CategoryPostsListView(ListViewMixin):
             slug=self.kwargs.get('category_slug'),
             is_published=True
         )
-        return self.category.posts(manager='published').comment_count()
+        return FeedEntry.objects.visible().filter(category=self.category)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -93,9 +242,32 @@ class CategoryPostsListView(ListViewMixin):
         return context
 
 
+class SearchView(ListViewMixin):
+    """Поиск по опубликованным постам, лучшие совпадения первыми."""
+
+    template_name = 'blog/search.html'
+    query_kwarg = 'q'
+    # Номера страниц потребовали бы COUNT по всем совпадениям.
+    cursor_pagination = True
+    cursor_order_field = 'rank'
+
+    @property
+    def query(self) -> str:
+        return self.request.GET.get(self.query_kwarg, '').strip()
+
+    def get_queryset(self):
+        return search_posts(Post.published.with_feed_data(), self.query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        return context
+
+
 # Система профиля.
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     model = Post
+    use_primary_db = True
     form_class = ProfileBaseForm
     template_name = 'blog/user.html'
 
@@ -110,7 +282,7 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         )
 
 
-class ProfileListView(ListViewMixin):
+class ProfileListView(FeedListMixin):
     template_name = 'blog/profile.html'
     user = None
 
@@ -118,13 +290,11 @@ class ProfileListView(ListViewMixin):
         username = self.kwargs.get('username')
         self.user = get_object_or_404(User, username=username)
 
+        entries = FeedEntry.objects.filter(author=self.user)
         if self.request.user.username == username:
-            posts = self.user.posts.comment_count()
-
-        else:
-            posts = self.user.posts(manager='published').comment_count()
+            return entries
 
-        return posts.all()
+        return entries.visible()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -155,29 +325,62 @@ class PostDeleteView(PostChangeMixin, DeleteView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['form'] = PostForm(instance=self.get_object())
+        context['form'] = PostForm(instance=self.object)
         return context
 
 
-class PostDetailView(DetailView):
+class VisiblePostMixin(ConditionalGetMixin):
+    """
+    Пост, доступный текущему пользователю, и постраничный вывод
+    комментариев к нему.
+    """
+
     model = Post
-    template_name = 'blog/detail.html'
+    queryset = Post.objects.select_related('author', 'location', 'category',
+                                           'rendered')
     pk_url_kwarg = 'post_id'
+    comments_cursor_kwarg = 'comments_cursor'
 
     def get_object(self, queryset=None):
         post = super().get_object(queryset)
-        if not (post.is_visible or post.author == self.request.user):
+        if not is_visible_to(post, self.request.user.pk):
             raise Http404
 
         return post
 
+    def get_comments_page(self):
+        page = get_comments_paginator(self.object).page(
+            self.request.GET.get(self.comments_cursor_kwarg)
+        )
+        load_unrendered_texts(page.object_list)
+        return page
+
+
+class PostDetailView(VisiblePostMixin, DetailView):
+    template_name = 'blog/detail.html'
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context.update({'form': CommentForm(),
-                        'comments': self.get_object().comments.all()})
+        context.update(get_comments_context(self.get_comments_page()))
         return context
 
 
+class PostCommentsView(VisiblePostMixin, DetailView):
+    """Следующая порция комментариев к посту для кнопки «Показать ещё»."""
+
+    comments_cursor_kwarg = 'cursor'
+
+    def render_to_response(self, context, **response_kwargs):
+        comments_page = self.get_comments_page()
+        html = render_to_string(
+            'includes/comment_list.html',
+            {'post': self.object, 'comments': comments_page.object_list},
+            request=self.request,
+        )
+        return JsonResponse({'html': html,
+                             'next_cursor': comments_page.next_cursor})
+
+
 # Система комментирования.
 class CommentCreateView(CommentMixin, CreateView):
     form_class = CommentForm
@@ -206,4 +409,4 @@ class CommentDeleteView(CommentChangeMixin, DeleteView):
     # Конкретно без этого переопределения не пропускали тесты, требовалось
     # чтобы в контексте не было "form".
     def get_context_data(self, **kwargs):
-        return {'comment': self.get_object()}
+        return {'comment': self.object}
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -31,13 +32,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blog.middleware.StaticFilesMiddleware',
+    'blog.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
 INTERNAL_IPS = [
@@ -70,10 +72,73 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
+# Профиль БД выбирается переменной окружения DB_ENGINE: sqlite (по
+# умолчанию, для установки на одном сервере) или postgresql.
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'blogicum'),
+            'USER': os.getenv('POSTGRES_USER', 'blogicum'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+
+# Реплики только для чтения: пути к файлам SQLite или хосты PostgreSQL
+# через запятую. Реплики получают алиасы replica_1, replica_2, ...
+DB_REPLICAS = [
+    replica for replica in os.getenv('DB_REPLICAS', '').split(',') if replica
+]
+for number, replica in enumerate(DB_REPLICAS, start=1):
+    replica_settings = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    if DB_ENGINE == 'postgresql':
+        replica_settings['HOST'] = replica
+    else:
+        replica_settings['NAME'] = replica
+    DATABASES[f'replica_{number}'] = replica_settings
+
+DATABASE_ROUTERS = ['blog.routers.PrimaryReplicaRouter']
+BLOG_DB_REPLICAS = [f'replica_{number}'
+                    for number in range(1, len(DB_REPLICAS) + 1)]
+
+# Сколько секунд после записи пользователь читает из основной БД.
+BLOG_PRIMARY_STICKY_COOKIE = 'use_primary_db'
+BLOG_PRIMARY_STICKY_SECONDS = 10
+
+# PRAGMA, выполняемые при каждом подключении к SQLite (см. blog/db.py).
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    # Сколько миллисекунд ждать снятия блокировки записи.
+    'busy_timeout': 20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -20000,
+    'temp_store': 'memory',
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum',
     }
 }
 
@@ -119,6 +184,21 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [
     BASE_DIR / 'static'
 ]
+
+# collectstatic собирает сюда файлы с хэшем в имени и их сжатые копии,
+# StaticFilesMiddleware отдает их без отдельного веб-сервера.
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'blog.staticfiles.CompressedManifestStaticFilesStorage',
+    },
+}
+# Срок кэширования статики без хэша в имени, с.
+BLOG_STATIC_MAX_AGE = 60
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -129,7 +209,35 @@ CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 LOGIN_REDIRECT_URL = 'blog:index'
 LOGIN_URL = 'login'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
-EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
-
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Лента листается по курсору (pub_date, id) вместо номера страницы.
+BLOG_CURSOR_PAGINATION = False
+
+# Асинхронные view ленты, профиля, категории и поста (для запуска под ASGI).
+BLOG_ASYNC_VIEWS = os.getenv('BLOG_ASYNC_VIEWS', '') == '1'
+# Debug Toolbar работает только синхронно: в асинхронной цепочке
+# middleware из-за него каждый запрос переключался бы в поток.
+if not BLOG_ASYNC_VIEWS:
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
+# Кэш страниц ленты для анонимных пользователей (0 — отключен).
+BLOG_PAGE_CACHE_ALIAS = 'default'
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Фоновая очередь задач включается переменной BLOG_JOB_QUEUE=1: тогда
+# задачи хранятся в таблице Job (DatabaseBackend) и нужен запущенный
+# обработчик run_jobs. По умолчанию ImmediateBackend выполняет их сразу.
+BLOG_JOB_QUEUE = os.getenv('BLOG_JOB_QUEUE', '') == '1'
+BLOG_JOB_BACKEND = ('blog.jobs.DatabaseBackend' if BLOG_JOB_QUEUE
+                    else 'blog.jobs.ImmediateBackend')
+# Задержка перед повторной попыткой (удваивается с каждой попыткой), с.
+BLOG_JOB_RETRY_DELAY = 10
+# Через сколько секунд задачу упавшего обработчика можно забрать снова.
+BLOG_JOB_LOCK_TIMEOUT = 60 * 10
+
+# С очередью письма отправляются через BLOG_EMAIL_BACKEND фоновой задачей.
+BLOG_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = ('blog.mail.QueuedEmailBackend' if BLOG_JOB_QUEUE
+                 else BLOG_EMAIL_BACKEND)
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
@@ -0,0 +1,32 @@
+// Панели связанных объектов на странице изменения в админке: страница
+// списка загружается при первом раскрытии панели и при переходе
+// по ссылкам пагинации.
+'use strict';
+{
+    function load(panel, url) {
+        const content = panel.querySelector('.related-panel-content');
+        fetch(url, {credentials: 'same-origin'})
+            .then((response) => response.text())
+            .then((html) => {
+                content.innerHTML = html;
+            });
+    }
+
+    document.addEventListener('DOMContentLoaded', () => {
+        document.querySelectorAll('.related-panel details').forEach((panel) => {
+            panel.addEventListener('toggle', () => {
+                if (panel.open && !panel.dataset.loaded) {
+                    panel.dataset.loaded = '1';
+                    load(panel, panel.dataset.url);
+                }
+            });
+            panel.addEventListener('click', (event) => {
+                const link = event.target.closest('.related-panel-page');
+                if (link) {
+                    event.preventDefault();
+                    load(panel, link.href);
+                }
+            });
+        });
+    });
+}
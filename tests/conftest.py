@@ -18,6 +18,7 @@ from typing import (
 
 import pytest
 from django.apps import apps
+from django.core.cache import caches
 from django.contrib.auth import get_user_model
 from django.db.models import Model, Field
 from django.forms import BaseForm
@@ -41,6 +42,19 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def run_jobs_immediately():
+    with override_settings(BLOG_JOB_BACKEND='blog.jobs.ImmediateBackend'):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -347,6 +361,13 @@ def get_field_key(field_type: type, field: Field) -> Tuple[str, Optional[str]]:
         return (field_type.__name__, None)
 
 
+@pytest.fixture(scope="session", autouse=True)
+def media_root(tmp_path_factory):
+    """Загруженные в тестах изображения и их варианты не попадают в media/."""
+    with override_settings(MEDIA_ROOT=tmp_path_factory.mktemp("media")):
+        yield
+
+
 @pytest.fixture(scope="session", autouse=True)
 def cleanup(request):
     start_time = time.time()
@@ -363,6 +384,8 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
+                    or filename.endswith(".jpeg")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -21,6 +21,14 @@ from conftest import (
 )
 
 
+@pytest.fixture
+def published_post(mixer: Mixer, user: Model, published_category: Model):
+    return mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category
+    )
+
+
 @pytest.fixture
 def posts_with_unpublished_category(mixer: Mixer, user: Model):
     return mixer.cycle(N_PER_FIXTURE).blend(
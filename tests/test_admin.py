@@ -0,0 +1,143 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+CHANGELISTS = ('/admin/blog/post/', '/admin/blog/comment/')
+
+
+def _count_queries(client, url: str) -> int:
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+@pytest.fixture
+def make_comments(mixer: Mixer, published_category, published_locations):
+    def make(amount: int):
+        comments = []
+        for number in range(amount):
+            user = mixer.blend('auth.User')
+            post = mixer.blend(
+                'blog.Post', author=user, category=published_category,
+                location=published_locations[number % 2],
+            )
+            comments.append(mixer.blend('blog.Comment', author=user,
+                                        post=post))
+        return comments
+    return make
+
+
+@pytest.mark.parametrize('url', CHANGELISTS)
+def test_changelist_query_count_does_not_depend_on_rows(
+        url, admin_client, make_comments):
+    make_comments(1)
+    single = _count_queries(admin_client, url)
+    make_comments(20)
+    assert _count_queries(admin_client, url) == single, (
+        'Убедитесь, что число запросов списка в админке не зависит '
+        'от числа строк, пользователей и постов.'
+    )
+
+
+@pytest.mark.parametrize('url, fields', (
+    ('/admin/blog/post/', ('author', 'location', 'category')),
+    ('/admin/blog/comment/', ('author', 'post')),
+))
+def test_changelist_keeps_editable_relations(url, fields, admin_client,
+                                             make_comments):
+    comment, *_ = make_comments(2)
+    content = admin_client.get(url).content.decode()
+    for field in fields:
+        assert f'name="form-0-{field}"' in content, (
+            'Убедитесь, что связанные поля остались редактируемыми в списке.'
+        )
+    if url == '/admin/blog/comment/':
+        assert comment.post.title in content
+
+
+def test_changelist_filters_by_username(admin_client, make_comments):
+    comment, *_ = make_comments(3)
+    response = admin_client.get(
+        '/admin/blog/comment/',
+        {'author__username': comment.author.username},
+    )
+    assert list(response.context['cl'].result_list) == [comment]
+    assert 'name="author__username"' in response.content.decode()
+
+    response = admin_client.get('/admin/blog/comment/',
+                                {'author__username': ''})
+    assert response.context['cl'].result_count == 3
+
+
+def test_change_form_does_not_list_all_users(admin_client, make_comments):
+    comment, *_ = make_comments(3)
+    response = admin_client.get(
+        f'/admin/blog/comment/{comment.pk}/change/'
+    )
+    content = response.content.decode()
+    assert 'admin-autocomplete' in content
+    # В выпадающем списке только выбранный автор, а не все пользователи.
+    assert content.count('<option value=') == 1
+
+
+@pytest.mark.parametrize('url_template', (
+    '/admin/blog/category/{category}/change/',
+    '/admin/blog/location/{location}/change/',
+    '/admin/blog/post/{post}/change/',
+))
+def test_change_form_does_not_depend_on_related_objects(
+        url_template, mixer: Mixer, admin_client, published_category,
+        published_locations):
+    post = mixer.blend('blog.Post', category=published_category,
+                       location=published_locations[0])
+    url = url_template.format(category=published_category.pk,
+                              location=published_locations[0].pk,
+                              post=post.pk)
+    admin_client.get(url)  # Прогрев кэша типов содержимого.
+    single = _count_queries(admin_client, url)
+    mixer.cycle(30).blend('blog.Post', category=published_category,
+                          location=published_locations[0])
+    mixer.cycle(30).blend('blog.Comment', post=post)
+    assert _count_queries(admin_client, url) == single, (
+        'Убедитесь, что страница изменения не загружает связанные объекты.'
+    )
+    assert 'related-panel' in admin_client.get(url).content.decode()
+
+
+def test_related_panel_pages(mixer: Mixer, admin_client, published_category):
+    posts = mixer.cycle(25).blend('blog.Post', category=published_category)
+    url = f'/admin/blog/category/{published_category.pk}/related/posts/'
+    response = admin_client.get(url)
+    assert response.status_code == 200
+    first_page = response.context['rows']
+    assert len(first_page) == 20
+    assert first_page[0][0] == f'/admin/blog/post/{posts[-1].pk}/change/'
+
+    response = admin_client.get(response.context['next_url'])
+    assert len(response.context['rows']) == 5
+    assert response.context['next_url'] is None
+    assert response.context['previous_url'] is not None
+
+
+def test_related_panel_comments(mixer: Mixer, admin_client):
+    comment = mixer.blend('blog.Comment')
+    response = admin_client.get(
+        f'/admin/blog/post/{comment.post_id}/related/comments/'
+    )
+    assert [url for url, _ in response.context['rows']] == [
+        f'/admin/blog/comment/{comment.pk}/change/'
+    ]
+    assert admin_client.get(
+        f'/admin/blog/post/{comment.post_id}/related/unknown/'
+    ).status_code == 404
+
+
+def test_related_panel_requires_staff(user_client, published_category):
+    response = user_client.get(
+        f'/admin/blog/category/{published_category.pk}/related/posts/'
+    )
+    assert response.status_code == 302
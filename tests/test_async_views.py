@@ -0,0 +1,121 @@
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.handlers.asgi import ASGIHandler
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory, override_settings
+
+from blog import async_views, views
+from blog.middleware import ReplicaRoutingMiddleware
+from blog.routers import primary_flag
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed(mixer, user, published_category):
+    mixer.cycle(N_PER_PAGE + 2).blend(
+        'blog.Post', author=user, is_published=True,
+        category=published_category,
+    )
+    return mixer.blend('blog.Post', author=user, is_published=False,
+                       category=published_category)
+
+
+def _get(view_class, path, user, **kwargs):
+    request = RequestFactory().get(path)
+    request.user = user
+    view = view_class.as_view()
+    if view_class.view_is_async:
+        view = async_to_sync(view)
+    response = view(request, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+def _shown_posts(response):
+    context = response.context_data
+    if 'post' in context:
+        return [context['post'].pk,
+                [comment.pk for comment in context['comments']]]
+    return [post.pk for post in context['page_obj']]
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+@pytest.mark.parametrize('cursor_pagination', (False, True))
+@pytest.mark.parametrize('is_owner', (False, True))
+def test_async_views_match_sync_views(
+        cursor_pagination, is_owner, feed, mixer, user, published_category):
+    mixer.cycle(3).blend('blog.Comment', author=user, post=feed)
+    page_user = user if is_owner else AnonymousUser()
+    pages = (
+        ('IndexListView', '/?page=2', {}),
+        ('CategoryPostsListView', '/', {
+            'category_slug': published_category.slug}),
+        ('ProfileListView', '/', {'username': user.username}),
+        ('PostDetailView', '/', {'post_id': feed.pk}),
+    )
+    with override_settings(BLOG_CURSOR_PAGINATION=cursor_pagination):
+        for name, path, kwargs in pages:
+            if name == 'PostDetailView' and not is_owner:
+                continue
+            sync_response = _get(getattr(views, name), path, page_user,
+                                 **kwargs)
+            async_response = _get(getattr(async_views, name), path,
+                                  page_user, **kwargs)
+            assert async_response.status_code == sync_response.status_code
+            assert (_shown_posts(async_response)
+                    == _shown_posts(sync_response)), (
+                f'Убедитесь, что асинхронная версия `{name}` показывает '
+                'те же посты, что и синхронная.'
+            )
+
+
+def test_async_detail_hides_unpublished_post(feed):
+    with pytest.raises(Http404):
+        _get(async_views.PostDetailView, '/', AnonymousUser(),
+             post_id=feed.pk)
+
+
+def test_async_view_returns_304(feed, user):
+    response = _get(async_views.IndexListView, '/', user)
+    request = RequestFactory().get('/', HTTP_IF_NONE_MATCH=response['ETag'])
+    request.user = user
+    response = async_to_sync(async_views.IndexListView.as_view())(request)
+    assert response.status_code == 304
+
+
+@override_settings(DEBUG=True, MIDDLEWARE=[
+    path for path in settings.MIDDLEWARE if 'debug_toolbar' not in path
+])
+def test_middleware_chain_is_async_under_asgi(caplog):
+    # При DEBUG Django пишет в лог о каждой middleware, ради которой
+    # запрос пришлось бы переключать в поток.
+    with caplog.at_level(logging.DEBUG, logger='django.request'):
+        ASGIHandler()
+    adapted = [record.getMessage() for record in caplog.records
+               if 'adapted' in record.getMessage()]
+    assert not adapted, (
+        'Убедитесь, что middleware блога поддерживают асинхронные запросы.'
+    )
+
+
+@override_settings(BLOG_DB_REPLICAS=['replica'])
+def test_replica_middleware_in_async_chain():
+    flags = []
+
+    async def get_response(request):
+        flags.append(primary_flag.get())
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(get_response)
+    assert iscoroutinefunction(middleware)
+    request = RequestFactory().post('/')
+    response = async_to_sync(middleware)(request)
+    assert flags == [True]
+    assert 'use_primary_db' in response.cookies
@@ -0,0 +1,52 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    for text in ('Первый', 'Второй'):
+        user_client.post(f'/posts/{post.id}/comment/', data={'text': text})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что при добавлении комментария увеличивается '
+        'счетчик `comment_count` у публикации.'
+    )
+
+    comment = post.comments.first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что при удалении комментария уменьшается '
+        'счетчик `comment_count` у публикации.'
+    )
+
+    Comment.objects.all().delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+
+def test_comment_count_follows_moved_comment(
+        mixer, user, post_with_published_location, post_of_another_author):
+    comment = mixer.blend('blog.Comment', author=user,
+                          post=post_with_published_location)
+    comment.post = post_of_another_author
+    comment.save()
+    counts = dict(Post.objects.values_list('pk', 'comment_count'))
+    assert counts[post_with_published_location.pk] == 0
+    assert counts[post_of_another_author.pk] == 1
+
+
+def test_recount_comments_command(mixer, user, post_with_published_location):
+    mixer.cycle(3).blend('blog.Comment', author=user,
+                         post=post_with_published_location)
+    Post.objects.update(comment_count=0)
+    call_command('recount_comments', batch_size=1, stdout=StringIO())
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.comment_count == 3
@@ -0,0 +1,59 @@
+import pytest
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+COMMENTS_ON_PAGE = 5
+
+
+@pytest.fixture(autouse=True)
+def small_comment_pages(monkeypatch):
+    monkeypatch.setattr('blog.views.COMMENTS_ON_PAGE', COMMENTS_ON_PAGE)
+
+
+@pytest.fixture
+def commented_post(mixer, user, post_with_published_location):
+    mixer.cycle(COMMENTS_ON_PAGE * 2 + 1).blend(
+        'blog.Comment', author=user, post=post_with_published_location,
+        text=mixer.sequence('Комментарий номер {0}.'),
+    )
+    return post_with_published_location
+
+
+def test_detail_page_shows_first_comments(commented_post, user_client):
+    response = user_client.get(f'/posts/{commented_post.id}/')
+    comments = list(response.context['comments'])
+    assert len(comments) == COMMENTS_ON_PAGE, (
+        'Убедитесь, что на странице поста выводится ограниченное '
+        'количество комментариев.'
+    )
+    assert response.context['comments_page'].has_next()
+    assert f'/posts/{commented_post.id}/comments/' in response.content.decode()
+
+
+def test_comments_fragment_endpoint(commented_post, user_client):
+    expected = list(commented_post.comments.order_by('created_at', 'pk')
+                                  .values_list('text', flat=True))
+    response = user_client.get(f'/posts/{commented_post.id}/')
+    cursor = response.context['comments_page'].next_cursor
+    loaded = [comment.text for comment in response.context['comments']]
+    while cursor:
+        data = user_client.get(
+            f'/posts/{commented_post.id}/comments/', {'cursor': cursor}
+        ).json()
+        loaded.extend(text for text in expected if text in data['html'])
+        cursor = data['next_cursor']
+    assert loaded == expected, (
+        'Убедитесь, что по курсорам подгружаются все оставшиеся '
+        'комментарии без пропусков и повторов.'
+    )
+
+
+def test_comments_fragment_respects_visibility(commented_post, client):
+    Post.objects.filter(pk=commented_post.pk).update(is_published=False)
+    response = client.get(f'/posts/{commented_post.id}/comments/')
+    assert response.status_code == 404, (
+        'Убедитесь, что комментарии к скрытому посту недоступны '
+        'другим пользователям.'
+    )
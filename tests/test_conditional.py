@@ -0,0 +1,45 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def urls(published_post, published_category, user):
+    return (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+        f'/posts/{published_post.id}/',
+    )
+
+
+def test_unchanged_pages_return_304(urls, client, user_client):
+    for page_client in (client, user_client):
+        for url in urls:
+            etag = page_client.get(url)['ETag']
+            response = page_client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304, (
+                f'Убедитесь, что неизменившаяся страница `{url}` '
+                'возвращается со статусом 304.'
+            )
+
+
+def test_etag_depends_on_user(urls, client, user_client):
+    for url in urls:
+        assert client.get(url)['ETag'] != user_client.get(url)['ETag'], (
+            'Убедитесь, что ETag страницы различается для анонимного '
+            'пользователя и автора.'
+        )
+
+
+def test_etag_changes_with_content(mixer, user, published_post, urls,
+                                   client):
+    etags = {url: client.get(url)['ETag'] for url in urls}
+    mixer.blend('blog.Comment', author=user, post=published_post)
+    for url in urls:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200, (
+            f'Убедитесь, что после изменений страница `{url}` '
+            'отдается заново.'
+        )
+
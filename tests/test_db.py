@@ -0,0 +1,34 @@
+import pytest
+from django.db import connection, connections
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='Настройки PRAGMA применяются только к SQLite.',
+    ),
+]
+
+
+def test_sqlite_connection_is_tuned(tmp_path):
+    settings_dict = {
+        **connection.settings_dict,
+        'NAME': str(tmp_path / 'db.sqlite3'),
+    }
+    wrapper = type(connections['default'])(settings_dict)
+    try:
+        with wrapper.cursor() as cursor:
+            pragmas = {}
+            for name in ('journal_mode', 'synchronous', 'busy_timeout'):
+                cursor.execute(f'PRAGMA {name}')
+                pragmas[name] = cursor.fetchone()[0]
+    finally:
+        wrapper.close()
+    assert pragmas == {
+        'journal_mode': 'wal',
+        'synchronous': 1,
+        'busy_timeout': 20000,
+    }, (
+        'Убедитесь, что новые подключения к SQLite работают в режиме WAL с '
+        'synchronous=NORMAL и таймаутом ожидания блокировки.'
+    )
@@ -0,0 +1,65 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.template.defaultfilters import truncatewords
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = 'слово ' * 20000
+
+
+@pytest.fixture
+def post(published_post):
+    published_post.text = LONG_TEXT
+    published_post.save()
+    return published_post
+
+
+@pytest.mark.parametrize('text', ('', 'Два слова', LONG_TEXT,
+                                  ' раз\n два\tтри ' * 5))
+def test_excerpt_matches_truncatewords(mixer, text):
+    post = mixer.blend('blog.Post', text=text)
+    assert post.excerpt == truncatewords(text, 10)
+
+
+@pytest.mark.parametrize('update_fields', (None, ['text']))
+def test_excerpt_follows_text(post, update_fields):
+    post.text = 'Новый текст'
+    post.save(update_fields=update_fields)
+    post.refresh_from_db()
+    assert post.excerpt == 'Новый текст', (
+        'Убедитесь, что анонс пересчитывается и при сохранении отдельных '
+        'полей, если среди них есть text.'
+    )
+
+
+@pytest.mark.parametrize('url_template', (
+    '/',
+    '/category/{category}/',
+    '/profile/{username}/',
+    '/admin/blog/post/',
+))
+def test_lists_do_not_load_post_text(url_template, post, admin_client):
+    url = url_template.format(category=post.category.slug,
+                              username=post.author.username)
+    with CaptureQueriesContext(connection) as context:
+        response = admin_client.get(url)
+    assert response.status_code == 200
+    assert truncatewords(LONG_TEXT, 10) in response.content.decode()
+    text_column = f'"{Post._meta.db_table}"."text"'
+    assert not any(text_column in query['sql']
+                   for query in context.captured_queries), (
+        'Убедитесь, что страницы списков не загружают полный текст постов.'
+    )
+
+
+def test_update_excerpts_command(post):
+    Post.objects.update(excerpt='')
+    call_command('update_excerpts', '--batch-size', '1', stdout=StringIO())
+    post.refresh_from_db()
+    assert post.excerpt == truncatewords(LONG_TEXT, 10)
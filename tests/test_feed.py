@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import FeedEntry, Post
+from blog.publishing import publish_due_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _entry(post) -> FeedEntry:
+    return FeedEntry.objects.get(pk=post.pk)
+
+
+def test_entry_follows_post(published_post, mixer, another_user):
+    entry = _entry(published_post)
+    assert (entry.is_visible, entry.author_id, entry.category_id,
+            entry.pub_date) == (True, published_post.author_id,
+                                published_post.category_id,
+                                published_post.pub_date)
+    published_post.is_published = False
+    published_post.author = another_user
+    published_post.save()
+    entry = _entry(published_post)
+    assert not entry.is_visible and entry.author_id == another_user.pk
+    published_post.delete()
+    assert not FeedEntry.objects.exists()
+
+
+def test_entry_follows_category(published_post, published_category):
+    published_category.is_published = False
+    published_category.save()
+    assert not _entry(published_post).is_visible
+    published_category.is_published = True
+    published_category.save()
+    assert _entry(published_post).is_visible
+    published_category.delete()
+    assert not _entry(published_post).is_visible
+
+
+def test_entry_follows_comments(published_post, mixer, user):
+    comments = mixer.cycle(3).blend('blog.Comment', post=published_post,
+                                    author=user)
+    assert _entry(published_post).comment_count == 3
+    comments[0].delete()
+    assert _entry(published_post).comment_count == 2
+
+
+def test_entry_follows_publication(published_post):
+    visible = FeedEntry.objects.visible().filter(pk=published_post.pk)
+    Post.objects.filter(pk=published_post.pk).update(
+        is_live=False, pub_date=timezone.now() + timedelta(hours=1)
+    )
+    call_command('rebuild_feed')
+    assert not visible.exists()
+    # Дата наступила, а планировщик еще не запускался.
+    Post.objects.filter(pk=published_post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    call_command('rebuild_feed')
+    assert visible.exists(), (
+        'Убедитесь, что отложенный пост появляется в ленте с наступлением '
+        'даты публикации и без обработчика очереди.'
+    )
+    assert publish_due_posts() == [published_post.pk]
+    assert visible.exists()
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite',
+                    reason='План запроса проверяется только для SQLite.')
+@pytest.mark.parametrize('get_queryset, index_name', (
+    (lambda: FeedEntry.objects.visible(), 'feed_visible_idx'),
+    (lambda: FeedEntry.objects.visible().filter(category_id=1),
+     'feed_category_idx'),
+    (lambda: FeedEntry.objects.visible().filter(author_id=1),
+     'feed_author_idx'),
+    (lambda: FeedEntry.objects.filter(author_id=1), 'feed_author_idx'),
+))
+def test_feed_page_is_index_range_scan(get_queryset, index_name):
+    plan = get_queryset().with_posts()[:10].explain()
+    assert index_name in plan and 'TEMP B-TREE' not in plan, (
+        f'Убедитесь, что страница ленты выбирается по индексу '
+        f'`{index_name}` без сортировки. План запроса:\n{plan}'
+    )
@@ -0,0 +1,69 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Count
+from django.utils import timezone
+
+from blog.cache import get_feed_version
+from blog.models import Category, Comment, FeedEntry, Location, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _generate(*args):
+    call_command('generate_data', '--users', '5', '--categories', '3',
+                 '--locations', '4', '--posts', '40', '--batch-size', '7',
+                 '--comments-per-post', '3', '--scheduled-share', '0.2',
+                 *args, stdout=StringIO())
+
+
+def test_generate_data():
+    _generate()
+    assert User.objects.count() == 5
+    assert Category.objects.count() == 3
+    assert Location.objects.count() == 4
+    assert Post.objects.count() == 40
+    assert FeedEntry.objects.count() == 40
+    assert Comment.objects.exists()
+
+    now = timezone.now()
+    scheduled = Post.objects.filter(pub_date__gt=now)
+    assert scheduled.exists(), (
+        'Убедитесь, что генератор создает отложенные посты.'
+    )
+    assert not scheduled.filter(is_live=True).exists()
+    assert not Post.objects.filter(pub_date__lte=now, is_live=False).exists()
+    assert not Comment.objects.filter(post__in=scheduled).exists()
+
+    for post in Post.objects.annotate(actual=Count('comments')):
+        assert post.comment_count == post.actual, (
+            'Убедитесь, что счетчики комментариев совпадают '
+            'с созданными комментариями.'
+        )
+        assert post.feed_entry.comment_count == post.actual
+
+
+def test_generate_data_invalidates_cached_pages():
+    version = get_feed_version()
+    _generate()
+    assert get_feed_version() != version, (
+        'Убедитесь, что после генерации данных закэшированные страницы '
+        'ленты становятся недействительными.'
+    )
+
+
+def test_generate_data_is_reproducible():
+    _generate('--prefix', 'first')
+    first = list(Post.objects.order_by('pk')
+                 .values_list('title', 'comment_count'))
+    _generate('--prefix', 'second')
+    second = list(Post.objects.order_by('pk')
+                  .values_list('title', 'comment_count'))[len(first):]
+    assert first == second
+
+
+def test_generate_data_prefix_conflict():
+    _generate()
+    with pytest.raises(CommandError):
+        _generate()
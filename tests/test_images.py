@@ -0,0 +1,111 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from blog import images
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _make_image(width: int, height: int) -> SimpleUploadedFile:
+    image = Image.new('RGB', (width, height), color=(73, 109, 137))
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera maker'
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', exif=exif)
+    return SimpleUploadedFile('photo.jpg', buffer.getvalue(),
+                              content_type='image/jpeg')
+
+
+@pytest.fixture
+def post_with_big_image(mixer, user, published_category):
+    return mixer.blend('blog.Post', author=user, is_published=True,
+                       category=published_category,
+                       image=_make_image(1000, 500))
+
+
+def test_renditions_are_built(post_with_big_image):
+    post = Post.objects.get(pk=post_with_big_image.pk)
+    formats = post.image_renditions['formats']
+    assert set(formats) == {'webp', 'jpeg'}
+    assert list(formats['webp']) == ['320', '640', '1000'], (
+        'Убедитесь, что создаются уменьшенные копии изображения и что '
+        'изображение не увеличивается.'
+    )
+    storage = post.image.storage
+    with storage.open(formats['jpeg']['320']) as file:
+        rendition = Image.open(file)
+        assert rendition.size == (320, 160)
+        assert not rendition.getexif()
+    with storage.open(post.image.name) as file:
+        assert not Image.open(file).getexif(), (
+            'Убедитесь, что из оригинала изображения удаляется EXIF.'
+        )
+
+
+def test_exif_is_stripped_without_reencoding(mixer, user,
+                                             published_category):
+    upload = _make_image(300, 200)
+    original = Image.open(BytesIO(upload.read()))
+    upload.seek(0)
+    post = mixer.blend('blog.Post', author=user, category=published_category,
+                       image=upload)
+    uploaded_name = post.image.name
+    post = Post.objects.get(pk=post.pk)
+    storage = post.image.storage
+    assert post.image.name != uploaded_name
+    assert not storage.exists(uploaded_name), (
+        'Убедитесь, что прежний оригинал удаляется после того, как пост '
+        'начал ссылаться на копию без EXIF.'
+    )
+    with storage.open(post.image.name) as file:
+        cleaned = Image.open(file)
+        assert not cleaned.getexif()
+        assert cleaned.tobytes() == original.tobytes(), (
+            'Убедитесь, что EXIF удаляется без перекодирования JPEG.'
+        )
+
+
+def test_original_is_kept_when_image_replaced(monkeypatch, mixer, user,
+                                              published_category):
+    post = mixer.blend('blog.Post', author=user, category=published_category)
+    post.image = _make_image(300, 200)
+    post.image.save(post.image.name, post.image.file, save=False)
+    Post.objects.filter(pk=post.pk).update(image=post.image.name)
+    build_renditions = images.build_renditions
+    built = []
+
+    def build_and_replace(post):
+        built.append(build_renditions(post))
+        Post.objects.filter(pk=post.pk).update(image='posts_images/other.jpg')
+        return built[0]
+
+    monkeypatch.setattr(images, 'build_renditions', build_and_replace)
+    images.process_post_image(post.pk)
+    storage = post.image.storage
+    assert storage.exists(post.image.name), (
+        'Убедитесь, что оригинал изображения не удаляется, если пока шла '
+        'обработка, изображение поста заменили.'
+    )
+    created = [built[0]['source'], *images.get_rendition_names(built[0])]
+    assert not any(storage.exists(name) for name in created)
+    storage.delete(post.image.name)
+
+
+def test_renditions_in_templates(post_with_big_image, user_client):
+    post = Post.objects.get(pk=post_with_big_image.pk)
+    for url in ('/', f'/posts/{post.pk}/'):
+        content = user_client.get(url).content.decode()
+        assert post.image_webp_srcset in content
+        assert post.image_jpeg_srcset in content
+
+
+def test_renditions_are_deleted_with_post(post_with_big_image):
+    post = Post.objects.get(pk=post_with_big_image.pk)
+    storage = post.image.storage
+    names = list(post.image_renditions['formats']['webp'].values())
+    post.delete()
+    assert not any(storage.exists(name) for name in names)
@@ -0,0 +1,40 @@
+import pytest
+from django.db import connection
+
+from blog.models import Comment, Post
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='План запроса проверяется только для SQLite.',
+    ),
+]
+
+
+@pytest.mark.parametrize('get_queryset, index_name', (
+    (
+        lambda: Post.published.with_feed_data().newest_first(),
+        'post_published_feed_idx',
+    ),
+    (
+        lambda: Post.objects.filter(category_id=1)
+                            .is_published()
+                            .order_by('-pub_date'),
+        'post_category_feed_idx',
+    ),
+    (
+        lambda: Post.objects.filter(author_id=1).order_by('-pub_date'),
+        'post_author_feed_idx',
+    ),
+    (
+        lambda: Comment.objects.filter(post_id=1),
+        'comment_post_created_idx',
+    ),
+))
+def test_feed_queries_use_indexes(get_queryset, index_name):
+    plan = get_queryset().explain()
+    assert index_name in plan, (
+        f'Убедитесь, что при выполнении запроса используется индекс '
+        f'`{index_name}`. План запроса:\n{plan}'
+    )
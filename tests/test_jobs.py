@@ -0,0 +1,124 @@
+from datetime import timedelta
+from email.mime.text import MIMEText
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.jobs import enqueue, job, run_pending_jobs
+from blog.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+calls = []
+
+
+@job
+def remember(value):
+    calls.append(value)
+
+
+@job
+def always_fails():
+    raise RuntimeError('Ошибка задачи')
+
+
+@pytest.fixture(autouse=True)
+def database_queue():
+    calls.clear()
+    with override_settings(BLOG_JOB_BACKEND='blog.jobs.DatabaseBackend',
+                           BLOG_JOB_RETRY_DELAY=0):
+        yield
+
+
+def test_jobs_run_in_worker():
+    enqueue(remember, 'значение')
+    assert calls == [], 'Убедитесь, что задача не выполняется при постановке.'
+    call_command('run_jobs', once=True, stdout=StringIO())
+    assert calls == ['значение']
+    assert Job.objects.get().status == Job.DONE
+
+
+@override_settings(BLOG_JOB_BACKEND='blog.jobs.ImmediateBackend')
+def test_immediate_backend_skips_future_jobs():
+    enqueue(remember, 'позже', run_at=timezone.now() + timedelta(hours=1))
+    enqueue(remember, 'сейчас')
+    assert calls == ['сейчас'], (
+        'Убедитесь, что ImmediateBackend не выполняет задачи, время которых '
+        'еще не наступило.'
+    )
+    assert not Job.objects.exists()
+
+
+def test_failed_job_is_retried():
+    enqueue(always_fails, max_attempts=2)
+    run_pending_jobs()
+    failed = Job.objects.get()
+    assert failed.status == Job.FAILED
+    assert failed.attempts == 2, (
+        'Убедитесь, что упавшая задача перезапускается, пока не исчерпано '
+        'количество попыток.'
+    )
+    assert 'Ошибка задачи' in failed.last_error
+
+
+@override_settings(
+    EMAIL_BACKEND='blog.mail.QueuedEmailBackend',
+    BLOG_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+def test_emails_are_sent_from_queue():
+    mail.send_mail('Тема', 'Текст', 'from@example.com', ['to@example.com'])
+    assert len(mail.outbox) == 0
+    run_pending_jobs()
+    assert [message.subject for message in mail.outbox] == ['Тема']
+
+
+@override_settings(
+    EMAIL_BACKEND='blog.mail.QueuedEmailBackend',
+    BLOG_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+def test_queued_emails_keep_attachments_and_subtype():
+    message = mail.EmailMessage('Тема', '<p>Текст</p>', 'from@example.com',
+                                ['to@example.com'])
+    message.content_subtype = 'html'
+    message.attach('report.txt', 'Отчет', 'text/plain')
+    message.attach('image.png', b'\x89PNG\x00', 'image/png')
+    message.send()
+    assert len(mail.outbox) == 0
+    run_pending_jobs()
+    sent, = mail.outbox
+    assert sent.content_subtype == 'html'
+    assert sent.attachments == [
+        ('report.txt', 'Отчет', 'text/plain'),
+        ('image.png', b'\x89PNG\x00', 'image/png'),
+    ], 'Убедитесь, что вложения письма сохраняются при постановке в очередь.'
+
+
+@override_settings(
+    EMAIL_BACKEND='blog.mail.QueuedEmailBackend',
+    BLOG_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+def test_emails_with_mime_parts_are_sent_directly():
+    message = mail.EmailMessage('Тема', 'Текст', 'from@example.com',
+                                ['to@example.com'])
+    message.attach(MIMEText('Часть письма'))
+    message.send()
+    assert not Job.objects.exists()
+    assert [sent.subject for sent in mail.outbox] == ['Тема']
+
+
+def test_replaced_image_is_deleted_by_worker(post_with_published_location):
+    post = post_with_published_location
+    storage = post.image.storage
+    old_name = post.image.name
+    post.image = None
+    post.save()
+    assert storage.exists(old_name), (
+        'Убедитесь, что замененное изображение удаляется фоновой задачей, '
+        'а не в запросе.'
+    )
+    run_pending_jobs()
+    assert not storage.exists(old_name)
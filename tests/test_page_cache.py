@@ -0,0 +1,101 @@
+import pytest
+from mixer.backend.django import Mixer
+
+from blog.views import IndexListView
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_feed_page_is_cached(
+        published_post, unlogged_client, django_assert_num_queries):
+    first = unlogged_client.get('/')
+    with django_assert_num_queries(0):
+        second = unlogged_client.get('/')
+    assert first.content == second.content, (
+        'Убедитесь, что анонимному пользователю повторно отдается '
+        'закэшированная страница ленты.'
+    )
+
+
+def test_cached_page_keeps_headers(monkeypatch, published_post,
+                                   unlogged_client):
+    render = IndexListView.render_to_response
+
+    def render_with_header(self, *args, **kwargs):
+        response = render(self, *args, **kwargs)
+        response['Cache-Control'] = 'max-age=60'
+        return response
+
+    monkeypatch.setattr(IndexListView, 'render_to_response',
+                        render_with_header)
+    first = unlogged_client.get('/')
+    second = unlogged_client.get('/')
+    assert second.context is None
+    for header in ('Content-Type', 'Cache-Control', 'Vary', 'ETag'):
+        assert second.headers.get(header) == first.headers.get(header), (
+            f'Убедитесь, что из кэша отдается ответ целиком, с заголовком '
+            f'{header}.'
+        )
+
+
+def test_unknown_query_params_share_cached_page(
+        published_post, unlogged_client, django_assert_num_queries):
+    unlogged_client.get('/')
+    with django_assert_num_queries(0):
+        response = unlogged_client.get('/', {'utm_source': 'mail'})
+    assert response.status_code == 200, (
+        'Убедитесь, что параметры запроса, не влияющие на страницу, не '
+        'попадают в ключ кэша.'
+    )
+    assert unlogged_client.get('/', {'page': 2}).status_code == 404
+
+
+def test_authenticated_feed_page_is_not_cached(published_post, user_client):
+    user_client.get('/')
+    response = user_client.get('/')
+    assert response.context is not None, (
+        'Убедитесь, что страницы ленты для авторизованных пользователей '
+        'не кэшируются.'
+    )
+
+
+@pytest.mark.parametrize('change', (
+    lambda post: setattr(post, 'title', 'Новый заголовок') or post.save(),
+    lambda post: post.category.save(),
+    lambda post: post.delete(),
+))
+def test_feed_page_cache_invalidation(change, published_post,
+                                      unlogged_client):
+    unlogged_client.get('/')
+    change(published_post)
+    response = unlogged_client.get('/')
+    assert response.context is not None, (
+        'Убедитесь, что закэшированные страницы ленты сбрасываются при '
+        'изменении публикаций и категорий.'
+    )
+
+
+def test_comment_invalidates_feed_page(
+        mixer: Mixer, user, published_post, unlogged_client):
+    unlogged_client.get('/')
+    mixer.blend('blog.Comment', author=user, post=published_post)
+    assert '(1)' in unlogged_client.get('/').content.decode()
+
+
+@pytest.mark.parametrize('change, expected', (
+    (lambda post: setattr(post, 'title', 'Новый заголовок') or post.save(),
+     'Новый заголовок'),
+    (lambda post: setattr(post.category, 'title', 'Новая категория')
+     or post.category.save(), 'Новая категория'),
+    (lambda post: setattr(post.author, 'username', 'new_author')
+     or post.author.save(), '@new_author'),
+))
+def test_post_card_fragment_is_refreshed(change, expected, published_post,
+                                         user_client):
+    user_client.get('/')
+    change(published_post)
+    content = user_client.get('/').content.decode()
+    assert expected in content, (
+        'Убедитесь, что закэшированная карточка поста обновляется при '
+        'изменении поста, его категории или автора.'
+    )
@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures('cursor_pagination'),
+]
+
+
+@pytest.fixture
+def cursor_pagination():
+    with override_settings(BLOG_CURSOR_PAGINATION=True):
+        yield
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    # Часть постов с одинаковой датой, чтобы проверить порядок по id.
+    now = timezone.now() - timedelta(days=1)
+    dates = [now - timedelta(hours=i // 3) for i in range(N_PER_PAGE * 2 + 5)]
+    mixer.cycle(len(dates)).blend(
+        'blog.Post', author=user, is_published=True,
+        category=published_category, pub_date=mixer.sequence(*dates),
+    )
+    return list(
+        user.posts.order_by('-pub_date', '-pk').values_list('pk', flat=True)
+    )
+
+
+def _page_ids(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    page = response.context['page_obj']
+    return [post.pk for post in page], page
+
+
+def test_cursor_pagination_walks_whole_feed(unlogged_client, feed_posts):
+    seen = []
+    url = '/'
+    while True:
+        ids, page = _page_ids(unlogged_client, url)
+        seen.extend(ids)
+        if not page.has_next():
+            break
+        url = f'/?cursor={page.next_cursor}'
+    assert seen == feed_posts, (
+        'Убедитесь, что при переходе по курсорам лента выводится целиком, '
+        'без пропусков и повторов.'
+    )
+
+    last_page_start = len(seen) - len(page)
+    ids, _ = _page_ids(unlogged_client, f'/?cursor={page.previous_cursor}')
+    assert ids == seen[last_page_start - N_PER_PAGE:last_page_start], (
+        'Убедитесь, что курсор предыдущей страницы возвращает '
+        'предшествующие посты ленты.'
+    )
+
+
+def test_cursor_pagination_last_page(unlogged_client, feed_posts):
+    _, first = _page_ids(unlogged_client, '/')
+    ids, page = _page_ids(unlogged_client, f'/?cursor={first.last_cursor}')
+    assert ids == feed_posts[-N_PER_PAGE:]
+    assert page.has_previous() and not page.has_next()
+
+
+def test_cursor_pagination_does_not_count(unlogged_client, feed_posts):
+    _, first = _page_ids(unlogged_client, '/')
+    with CaptureQueriesContext(connection) as context:
+        unlogged_client.get(f'/?cursor={first.next_cursor}')
+    assert not any('COUNT(' in query['sql'].upper()
+                   for query in context.captured_queries), (
+        'Убедитесь, что при пагинации по курсору не выполняется COUNT.'
+    )
+
+
+def test_invalid_cursor_returns_404(unlogged_client):
+    assert unlogged_client.get('/?cursor=not-a-cursor').status_code == 404
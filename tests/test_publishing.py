@@ -0,0 +1,92 @@
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from blog import cache
+from blog.cache import get_feed_version
+from blog.models import FeedEntry, Job, Post
+from blog.publishing import post_published, publish_due_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend('blog.Post', author=user, is_published=True,
+                       category=published_category, title='Отложенный пост',
+                       pub_date=timezone.now() + timedelta(hours=1))
+
+
+def _arrive(post):
+    """Переводит часы: дата публикации поста наступила."""
+    pub_date = timezone.now() - timedelta(seconds=1)
+    Post.objects.filter(pk=post.pk).update(pub_date=pub_date)
+    FeedEntry.objects.filter(pk=post.pk).update(pub_date=pub_date)
+
+
+def test_post_is_live_on_save(scheduled_post):
+    assert not scheduled_post.is_live
+    scheduled_post.pub_date = timezone.now() - timedelta(minutes=1)
+    scheduled_post.save()
+    assert Post.published.filter(pk=scheduled_post.pk).exists()
+
+
+@override_settings(BLOG_JOB_BACKEND='blog.jobs.DatabaseBackend')
+def test_scheduled_post_appears_without_worker(
+        monkeypatch, scheduled_post, client):
+    assert 'Отложенный пост' not in client.get('/').content.decode()
+    _arrive(scheduled_post)
+    # Наступил и момент, запомненный для закэшированных страниц.
+    later = time.time() + 2 * 60 * 60
+    monkeypatch.setattr(cache, 'time', SimpleNamespace(time=lambda: later))
+    assert Post.published.filter(pk=scheduled_post.pk).exists()
+    assert 'Отложенный пост' in client.get('/').content.decode(), (
+        'Убедитесь, что отложенный пост появляется в ленте с наступлением '
+        'даты публикации, даже если обработчик очереди не запущен.'
+    )
+
+
+def test_scheduled_post_appears_after_publication(scheduled_post, client):
+    _arrive(scheduled_post)
+    received = []
+    post_published.connect(
+        lambda sender, post_ids, **kwargs: received.extend(post_ids),
+        weak=False, dispatch_uid='test_publishing',
+    )
+    try:
+        version = get_feed_version()
+        call_command('publish_posts')
+    finally:
+        post_published.disconnect(dispatch_uid='test_publishing')
+    assert received == [scheduled_post.pk]
+    assert get_feed_version() != version
+    assert 'Отложенный пост' in client.get('/').content.decode()
+    assert publish_due_posts() == []
+
+
+@override_settings(BLOG_JOB_BACKEND='blog.jobs.DatabaseBackend')
+def test_publication_job_is_scheduled(mixer, user, published_category):
+    pub_date = timezone.now() + timedelta(days=1)
+    post = mixer.blend('blog.Post', author=user, category=published_category,
+                       pub_date=pub_date)
+    post.save()
+    assert Job.objects.filter(name='blog.tasks.publish_posts',
+                              run_at=pub_date).count() == 1, (
+        'Убедитесь, что повторное сохранение отложенного поста не ставит '
+        'в очередь еще одну задачу публикации.'
+    )
+
+
+@override_settings(BLOG_JOB_BACKEND='blog.jobs.DatabaseBackend')
+def test_worker_publishes_posts_without_jobs(scheduled_post, client):
+    # Как после bulk_create: задачи публикации нет.
+    Job.objects.all().delete()
+    _arrive(scheduled_post)
+    call_command('run_jobs', '--once')
+    assert Post.published.filter(pk=scheduled_post.pk).exists()
+    assert 'Отложенный пост' in client.get('/').content.decode()
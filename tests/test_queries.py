@@ -0,0 +1,115 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_queries(client, url: str) -> int:
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+@pytest.fixture
+def make_feed_posts(mixer: Mixer, user, published_locations,
+                    published_category):
+    def make(amount: int):
+        return mixer.cycle(amount).blend(
+            'blog.Post',
+            author=user,
+            is_published=True,
+            category=published_category,
+            location=mixer.sequence(*published_locations),
+        )
+    return make
+
+
+@pytest.mark.parametrize('url_template', (
+    '/',
+    '/category/{category}/',
+    '/profile/{username}/',
+))
+def test_feed_query_count_does_not_depend_on_page_size(
+        url_template, make_feed_posts, user, published_category,
+        user_client, unlogged_client):
+    url = url_template.format(category=published_category.slug,
+                              username=user.username)
+    make_feed_posts(1)
+    single_post = {
+        'owner': _count_queries(user_client, url),
+        'guest': _count_queries(unlogged_client, url),
+    }
+    make_feed_posts(N_PER_PAGE * 2)
+    full_page = {
+        'owner': _count_queries(user_client, url),
+        'guest': _count_queries(unlogged_client, url),
+    }
+    assert single_post == full_page, (
+        f'Убедитесь, что количество запросов к БД на странице `{url}` '
+        'не зависит от количества постов на ней.'
+    )
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_index_query_count(make_feed_posts, unlogged_client,
+                           django_assert_num_queries):
+    make_feed_posts(N_PER_PAGE)
+    unlogged_client.get('/')
+    # COUNT для пагинатора и выборка страницы вместе со связанными объектами.
+    with django_assert_num_queries(2):
+        unlogged_client.get('/')
+
+
+@pytest.mark.parametrize('comments_amount', (1, N_PER_PAGE))
+def test_post_detail_query_count(
+        comments_amount, mixer, user, another_user,
+        post_with_published_location, unlogged_client, user_client,
+        django_assert_num_queries):
+    mixer.cycle(comments_amount).blend(
+        'blog.Comment', post=post_with_published_location,
+        author=mixer.sequence(user, another_user),
+    )
+    url = f'/posts/{post_with_published_location.id}/'
+    unlogged_client.get(url)
+    # Пост со связанными объектами и комментарии с авторами.
+    with django_assert_num_queries(2):
+        unlogged_client.get(url)
+    # Плюс сессия и пользователь.
+    with django_assert_num_queries(4):
+        user_client.get(url)
+
+
+def _count_table_selects(captured_queries, table: str) -> int:
+    return sum(
+        query['sql'].startswith('SELECT')
+        and f'FROM "{table}"' in query['sql']
+        for query in captured_queries
+    )
+
+
+@pytest.mark.parametrize('url_template, table', (
+    ('/posts/{post}/edit/', 'blog_post'),
+    ('/posts/{post}/delete/', 'blog_post'),
+    ('/posts/{post}/edit_comment/{comment}/', 'blog_comment'),
+    ('/posts/{post}/delete_comment/{comment}/', 'blog_comment'),
+))
+def test_change_views_fetch_object_once(
+        url_template, table, mixer, user, user_client,
+        post_with_published_location):
+    comment = mixer.blend('blog.Comment', author=user,
+                          post=post_with_published_location)
+    url = url_template.format(post=post_with_published_location.id,
+                              comment=comment.id)
+    with CaptureQueriesContext(connection) as context:
+        response = user_client.get(url)
+    assert response.status_code == 200
+    assert _count_table_selects(context.captured_queries, table) == 1, (
+        f'Убедитесь, что на странице `{url}` редактируемый объект '
+        'запрашивается из БД один раз.'
+    )
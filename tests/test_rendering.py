@@ -0,0 +1,108 @@
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_migrate
+from django.test.utils import CaptureQueriesContext
+
+from blog import rendering, tasks
+from blog.cache import get_feed_version
+from blog.models import Comment, CommentHTML, Post, PostHTML
+
+pytestmark = [pytest.mark.django_db]
+
+TEXT = 'Первая строка\n<script>alert(1)</script>'
+HTML = 'Первая строка<br>&lt;script&gt;alert(1)&lt;/script&gt;'
+
+
+@pytest.fixture
+def post(published_post):
+    published_post.text = TEXT
+    published_post.save()
+    return published_post
+
+
+def test_html_is_stored_on_save(post):
+    rendered = PostHTML.objects.get(post=post)
+    assert rendered.html == HTML
+    assert rendered.version == rendering.RENDERER_VERSION
+
+    post.text = 'Новый текст'
+    post.save()
+    assert PostHTML.objects.get(post=post).html == 'Новый текст'
+
+
+def test_detail_outputs_stored_html(mixer, user_client, post):
+    mixer.cycle(3).blend('blog.Comment', post=post, text=TEXT)
+    PostHTML.objects.update(html='Сохраненный HTML поста')
+    CommentHTML.objects.update(html='Сохраненный HTML комментария')
+    with CaptureQueriesContext(connection) as context:
+        response = user_client.get(f'/posts/{post.pk}/')
+    content = response.content.decode()
+    assert 'Сохраненный HTML поста' in content
+    assert content.count('Сохраненный HTML комментария') == 3
+    comment_text = f'"{Comment._meta.db_table}"."text"'
+    assert not any(comment_text in query['sql']
+                   for query in context.captured_queries), (
+        'Убедитесь, что страница поста не загружает исходный текст '
+        'комментариев.'
+    )
+
+
+def test_missing_html_is_rendered_on_output(user_client, post):
+    PostHTML.objects.all().delete()
+    response = user_client.get(f'/posts/{post.pk}/')
+    assert HTML in response.content.decode()
+
+
+def test_new_renderer_version_rerenders_in_background(
+        monkeypatch, mixer, post):
+    mixer.cycle(3).blend('blog.Comment', post=post, text=TEXT)
+    monkeypatch.setattr(rendering, 'RENDERER_VERSION', 2)
+    monkeypatch.setattr(rendering, 'render_text', lambda text: 'v2')
+    assert rendering.has_stale(Post)
+    # Задача перерисовывает по одной пачке и ставит в очередь следующую.
+    monkeypatch.setattr(tasks, 'RENDER_BATCH_SIZE', 1)
+    post_migrate.send(apps.get_app_config('blog'),
+                      app_config=apps.get_app_config('blog'),
+                      using='default')
+    assert set(PostHTML.objects.values_list('html', 'version')) == {('v2', 2)}
+    assert set(CommentHTML.objects.values_list('html', 'version')) == {
+        ('v2', 2)
+    }
+    assert not rendering.has_stale(Comment)
+
+
+def test_rerender_invalidates_cached_pages(monkeypatch, client, post):
+    client.get('/')
+    version = get_feed_version()
+    monkeypatch.setattr(rendering, 'RENDERER_VERSION', 2)
+    tasks.render_texts('blog.Post')
+    assert get_feed_version() != version, (
+        'Убедитесь, что после перерисовки текстов закэшированные страницы '
+        'становятся недействительными.'
+    )
+
+
+def test_comments_without_html_load_texts_in_bulk(mixer, user_client, post):
+    mixer.cycle(10).blend('blog.Comment', post=post, text=TEXT)
+    CommentHTML.objects.all().delete()
+    url = f'/posts/{post.pk}/'
+    with CaptureQueriesContext(connection) as context:
+        response = user_client.get(url)
+    assert response.content.decode().count(HTML) == 11
+    comment_text = f'"{Comment._meta.db_table}"."text"'
+    assert sum(comment_text in query['sql']
+               for query in context.captured_queries) == 1, (
+        'Убедитесь, что тексты неотрисованных комментариев загружаются '
+        'одним запросом.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migrate_before_rendered_text():
+    try:
+        call_command('migrate', 'blog', '0015', verbosity=0)
+    finally:
+        call_command('migrate', 'blog', verbosity=0)
+    assert PostHTML.objects.count() == 0
@@ -0,0 +1,113 @@
+import pytest
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import override_settings
+
+from blog.cache import (FEED_CHANGED_KEY, bump_feed_version, get_page_key,
+                        page_cache)
+from blog.middleware import ReplicaRoutingMiddleware
+from blog.models import Post
+from blog.routers import PrimaryReplicaRouter, is_primary_forced, use_primary
+
+pytestmark = [pytest.mark.django_db]
+
+router = PrimaryReplicaRouter()
+
+
+@pytest.fixture
+def replica():
+    with override_settings(BLOG_DB_REPLICAS=['replica']):
+        yield
+
+
+@pytest.fixture
+def default_as_replica():
+    # Реплика, указывающая на ту же тестовую БД: маршрутизация включена,
+    # а запросы к БД во view продолжают работать.
+    with override_settings(BLOG_DB_REPLICAS=['default']):
+        yield
+
+
+@pytest.fixture
+def routing_spy(monkeypatch):
+    """Запоминает, была ли для view принудительно выбрана основная БД."""
+    calls = []
+    from blog import views
+
+    original = views.IndexListView.get_queryset
+
+    def get_queryset(self):
+        calls.append(is_primary_forced())
+        return original(self)
+
+    monkeypatch.setattr(views.IndexListView, 'get_queryset', get_queryset)
+    return calls
+
+
+def test_router_without_replicas():
+    assert router.db_for_read(Post) == 'default'
+    assert router.db_for_write(Post) == 'default'
+
+
+def test_router_reads_from_replica(replica):
+    assert router.db_for_read(Post) == 'replica'
+    assert router.db_for_read(Session) == 'default'
+    assert router.db_for_write(Post) == 'default'
+    with use_primary():
+        assert router.db_for_read(Post) == 'default'
+    assert router.allow_migrate('replica', 'blog') is False
+
+
+def test_write_sets_sticky_cookie(default_as_replica, user_client,
+                                  post_with_published_location):
+    response = user_client.post(
+        f'/posts/{post_with_published_location.id}/comment/',
+        data={'text': 'Комментарий'},
+    )
+    assert settings.BLOG_PRIMARY_STICKY_COOKIE in response.cookies, (
+        'Убедитесь, что после записи пользователю ставится cookie, '
+        'направляющая его запросы в основную БД.'
+    )
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_sticky_cookie_forces_primary(default_as_replica, routing_spy, client):
+    client.get('/')
+    client.cookies[settings.BLOG_PRIMARY_STICKY_COOKIE] = '1'
+    client.get('/')
+    assert routing_spy == [False, True]
+    assert not is_primary_forced()
+
+
+@override_settings(BLOG_DB_REPLICAS=['replica_1', 'replica_2', 'replica_3'])
+def test_one_replica_per_request(rf):
+    chosen = []
+
+    def get_response(request):
+        chosen.extend(router.db_for_read(Post) for _ in range(20))
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(get_response)
+    for _ in range(10):
+        middleware(rf.get('/'))
+        assert len(set(chosen)) == 1, (
+            'Убедитесь, что все чтения одного запроса идут в одну реплику.'
+        )
+        chosen.clear()
+
+
+def test_page_is_not_cached_while_replicas_catch_up(default_as_replica,
+                                                    client):
+    bump_feed_version()
+    response = client.get('/')
+    assert 'ETag' not in response.headers
+    assert page_cache().get(get_page_key(response.wsgi_request)) is None, (
+        'Убедитесь, что сразу после изменения ленты страница, прочитанная '
+        'из реплики, не кэшируется под новой версией.'
+    )
+
+    page_cache().delete(FEED_CHANGED_KEY)
+    response = client.get('/')
+    assert 'ETag' in response.headers
+    assert page_cache().get(get_page_key(response.wsgi_request)) is not None
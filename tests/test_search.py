@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Post
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(title, text='Текст.', **kwargs):
+        kwargs.setdefault('pub_date', timezone.now() - timedelta(days=1))
+        kwargs.setdefault('is_published', True)
+        kwargs.setdefault('category', published_category)
+        return mixer.blend('blog.Post', author=user, title=title, text=text,
+                           **kwargs)
+    return make
+
+
+def _found_titles(client, query, **params):
+    response = client.get('/search/', {'q': query, **params})
+    assert response.status_code == 200
+    return [post.title for post in response.context['page_obj']]
+
+
+def test_search_uses_stemming(make_post, client):
+    make_post('Собаки на прогулке')
+    make_post('Про машины', text='Соседская собака лаяла всю ночь.')
+    make_post('Кошки')
+    assert sorted(_found_titles(client, 'собака')) == [
+        'Про машины', 'Собаки на прогулке'
+    ], (
+        'Убедитесь, что поиск находит посты по другим формам слова '
+        'в заголовке и тексте.'
+    )
+
+
+def test_search_ranks_title_matches_first(make_post, client):
+    make_post('Заметки', text='Немного про путешествия.')
+    make_post('Путешествия')
+    assert _found_titles(client, 'путешествие') == [
+        'Путешествия', 'Заметки'
+    ]
+
+
+def test_search_respects_visibility(make_post, mixer, client):
+    make_post('Видимый пост о реке')
+    make_post('Скрытый пост о реке', is_published=False)
+    make_post('Отложенный пост о реке',
+              pub_date=timezone.now() + timedelta(days=1))
+    make_post('Пост о реке в скрытой категории',
+              category=mixer.blend('blog.Category', is_published=False))
+    assert _found_titles(client, 'река') == ['Видимый пост о реке']
+
+
+def test_search_index_follows_changes(make_post, client):
+    post = make_post('Горы')
+    post.title = 'Море'
+    post.save()
+    assert _found_titles(client, 'горы') == []
+    assert _found_titles(client, 'море') == ['Море']
+    post.delete()
+    assert _found_titles(client, 'море') == []
+
+
+def test_search_cursor_pagination(make_post, client):
+    for number in range(N_PER_PAGE + 3):
+        make_post(f'Поезд номер {number}',
+                  text='Поезд ' * (number % 4 + 1))
+    expected = set(Post.objects.values_list('title', flat=True))
+    found = []
+    params = {}
+    while True:
+        response = client.get('/search/', {'q': 'поезда', **params})
+        found.extend(post.title for post in response.context['page_obj'])
+        page = response.context['page_obj']
+        if not page.has_next():
+            break
+        assert 'q=%D0%BF%D0%BE%D0%B5%D0%B7%D0%B4%D0%B0&amp;cursor=' in (
+            response.content.decode()
+        ), 'Убедитесь, что ссылки пагинации сохраняют поисковый запрос.'
+        params = {'cursor': page.next_cursor}
+    assert len(found) == len(expected) and set(found) == expected, (
+        'Убедитесь, что по курсорам выводятся все найденные посты '
+        'без пропусков и повторов.'
+    )
+
+
+@pytest.mark.parametrize('query', ('', '   ', '"*)(-', 'NEAR AND'))
+def test_search_handles_any_input(make_post, client, query):
+    make_post('AND NEAR OR')
+    response = client.get('/search/', {'q': query})
+    assert response.status_code == 200
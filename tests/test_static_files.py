@@ -0,0 +1,114 @@
+import gzip
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test.utils import override_settings
+
+from blog import staticfiles
+
+pytestmark = [pytest.mark.django_db]
+
+CSS = 'css/bootstrap.min.css'
+
+
+def _content(response) -> bytes:
+    return b''.join(response.streaming_content)
+
+
+@pytest.fixture
+def static_root(tmp_path, monkeypatch):
+    # Пакета Brotli может не быть, поэтому .br создает заглушка.
+    monkeypatch.setattr(staticfiles, 'brotli', SimpleNamespace(
+        compress=lambda content, quality: b'br:' + content[:10]
+    ))
+    with override_settings(STATIC_ROOT=tmp_path):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        yield tmp_path
+
+
+@pytest.fixture
+def hashed_url(static_root) -> str:
+    return staticfiles_storage.url(CSS)
+
+
+def test_static_tag_outputs_hashed_names(client, static_root):
+    content = client.get('/').content.decode()
+    assert staticfiles_storage.url('img/fav/favicon.ico') in content
+    assert '/static/img/fav/favicon.ico"' not in content
+
+
+def test_static_without_manifest_uses_original_names():
+    assert staticfiles_storage.url(CSS) == f'/static/{CSS}'
+
+
+def test_collectstatic_compresses_text_files(static_root, hashed_url):
+    name = hashed_url.removeprefix('/static/')
+    original = (static_root / name).read_bytes()
+    assert gzip.decompress((static_root / f'{name}.gz').read_bytes()) == (
+        original
+    )
+    assert (static_root / f'{name}.br').exists()
+    assert not (static_root / 'img/logo.png.gz').exists()
+
+
+@pytest.mark.parametrize('accept_encoding, encoding', (
+    ('gzip, deflate, br', 'br'),
+    ('gzip;q=1.0, br;q=0', 'gzip'),
+    ('', None),
+))
+def test_content_encoding_negotiation(client, static_root, hashed_url,
+                                      accept_encoding, encoding):
+    response = client.get(hashed_url, HTTP_ACCEPT_ENCODING=accept_encoding)
+    assert response.status_code == 200
+    assert response.headers.get('Content-Encoding') == encoding
+    assert response.headers['Content-Type'] == 'text/css'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    content = _content(response)
+    original = (static_root / CSS).read_bytes()
+    if encoding == 'gzip':
+        content = gzip.decompress(content)
+    if encoding != 'br':
+        assert content == original
+
+
+def test_hashed_files_are_immutable(client, hashed_url):
+    response = client.get(hashed_url)
+    assert response.headers['Cache-Control'] == (
+        'public, max-age=31536000, immutable'
+    )
+    _content(response)
+
+
+def test_files_collected_after_start_are_immutable(client, tmp_path):
+    with override_settings(STATIC_ROOT=tmp_path):
+        assert client.get('/static/css/missing.css').status_code == 404
+        call_command('collectstatic', interactive=False, verbosity=0)
+        response = client.get(staticfiles_storage.url(CSS))
+        assert response.headers['Cache-Control'] == (
+            'public, max-age=31536000, immutable'
+        ), (
+            'Убедитесь, что файлы, собранные collectstatic после запуска '
+            'сервера, тоже кэшируются навсегда.'
+        )
+        _content(response)
+
+
+def test_original_names_are_revalidated(client, static_root):
+    response = client.get(f'/static/{CSS}')
+    assert response.headers['Cache-Control'] == 'public, max-age=60'
+    _content(response)
+    response = client.get(
+        f'/static/{CSS}',
+        HTTP_IF_MODIFIED_SINCE=response.headers['Last-Modified'],
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize('path', ('/static/../manage.py',
+                                  '/static/%2e%2e/settings.py',
+                                  '/static/css/missing.css'))
+def test_unknown_paths_are_not_served(client, static_root, path):
+    (static_root.parent / 'settings.py').write_text('SECRET')
+    assert client.get(path).status_code == 404
@@ -0,0 +1,113 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import F
+
+from blog.cache import get_feed_version
+from blog.models import Category, Comment, FeedEntry, Location, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+MODELS = (Category, Location, Post, Comment)
+
+
+@pytest.fixture
+def content(mixer, user, another_user, published_category,
+            published_locations):
+    posts = mixer.cycle(4).blend(
+        'blog.Post', author=mixer.sequence(user, another_user),
+        category=published_category, location=published_locations[0],
+        is_published=True, text=mixer.sequence('Текст про реку {0}'),
+    )
+    mixer.cycle(6).blend('blog.Comment', author=user,
+                         post=mixer.sequence(*posts))
+    return _snapshot()
+
+
+def _snapshot():
+    # Пользователи создаются при импорте заново, поэтому авторы
+    # сравниваются по username.
+    return {
+        model: [
+            {key: value for key, value in row.items() if key != 'author_id'}
+            for row in model.objects.order_by('pk').values(
+                *(field.attname for field in model._meta.concrete_fields),
+                **({'author_name': F('author__username')}
+                   if model in (Post, Comment) else {}),
+            )
+        ]
+        for model in MODELS
+    }
+
+
+def _export(tmp_path):
+    path = tmp_path / 'blog.jsonl'
+    call_command('export_blog', str(path), stderr=StringIO())
+    return path
+
+
+def _clear():
+    for model in reversed(MODELS):
+        model.objects.all().delete()
+    User.objects.all().delete()
+
+
+def test_export_import_roundtrip(content, tmp_path, client):
+    path = _export(tmp_path)
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == sum(len(rows) for rows in content.values())
+    _clear()
+
+    call_command('import_blog', str(path), '--batch-size', '2',
+                 stdout=StringIO())
+    for model, rows in _snapshot().items():
+        assert rows == content[model], (
+            f'Убедитесь, что объекты {model.__name__} восстанавливаются '
+            'из выгрузки без изменений.'
+        )
+    assert FeedEntry.objects.count() == len(content[Post])
+    assert FeedEntry.objects.visible().count() == len(content[Post]), (
+        'Убедитесь, что импортированные посты видны в ленте.'
+    )
+    response = client.get('/')
+    assert len(response.context['page_obj']) == len(content[Post])
+    assert not User.objects.first().has_usable_password()
+    response = client.get('/search/', {'q': 'реки'})
+    assert len(response.context['page_obj']) == len(content[Post])
+
+
+def test_import_invalidates_cached_pages(content, tmp_path):
+    path = _export(tmp_path)
+    _clear()
+    version = get_feed_version()
+    call_command('import_blog', str(path), stdout=StringIO())
+    assert get_feed_version() != version, (
+        'Убедитесь, что после импорта закэшированные страницы ленты '
+        'становятся недействительными.'
+    )
+
+
+def test_import_resolves_forward_references(content, tmp_path):
+    path = _export(tmp_path)
+    lines = path.read_text(encoding='utf-8').splitlines()
+    _clear()
+    path.write_text('\n'.join(reversed(lines)), encoding='utf-8')
+    call_command('import_blog', str(path), stdout=StringIO())
+    assert Comment.objects.count() == len(content[Comment])
+
+
+def test_import_without_users(content, tmp_path):
+    path = _export(tmp_path)
+    _clear()
+    with pytest.raises(CommandError):
+        call_command('import_blog', str(path), '--no-create-users')
+    assert not Post.objects.exists()
+
+
+def test_export_is_loaddata_compatible(content, tmp_path):
+    path = _export(tmp_path)
+    row = json.loads(path.read_text(encoding='utf-8').splitlines()[-1])
+    assert row['model'] == 'blog.comment'
+    assert isinstance(row['fields']['author'], list)